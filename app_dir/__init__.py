@@ -5,7 +5,10 @@ from flask_mail import Mail
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from dotenv import load_dotenv
-import os, datetime
+from app_dir.broker import Broker
+from app_dir.cache import DayBucketCache, ResponseCache
+from app_dir.live import LiveFeed
+import os, datetime, tempfile
 
 load_dotenv()
 
@@ -14,6 +17,10 @@ mail = Mail()
 migrate = Migrate()
 db = SQLAlchemy()
 jwt = JWTManager()
+response_cache = ResponseCache()
+day_buckets = DayBucketCache()
+broker = Broker()
+live_feed = LiveFeed(broker)
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
@@ -40,7 +47,7 @@ def json_err(payload=None, code=400):
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_FILES_EXTENSIONS
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
 
     app.config.from_mapping(
@@ -61,16 +68,44 @@ def create_app():
 
         UPLOAD_FOLDER=UPLOAD_FOLDER,
         MAX_CONTENT_LENGTH=16 * 1024 * 1024,
+
+        RESPONSE_CACHE_TTL=int(os.getenv("RESPONSE_CACHE_TTL", 30)),
+        RESPONSE_CACHE_SIZE=int(os.getenv("RESPONSE_CACHE_SIZE", 1024)),
+        CALENDAR_CACHE_DAYS=int(os.getenv("CALENDAR_CACHE_DAYS", 366)),
+        CALENDAR_WARM_DAYS=int(os.getenv("CALENDAR_WARM_DAYS", 7)),
+        CALENDAR_CACHE_TTL=int(os.getenv("CALENDAR_CACHE_TTL", 60)),
+        CALENDAR_WARM_INTERVAL=int(os.getenv("CALENDAR_WARM_INTERVAL", 30)),  # 0 turns the warm-up off
+        BROKER_BACKEND=os.getenv("BROKER_BACKEND", "local"),  # local, or unix to relay between workers
+        BROKER_SOCKET_DIR=os.getenv("BROKER_SOCKET_DIR", os.path.join(tempfile.gettempdir(), "football-broker")),
+        BROKER_QUEUE_SIZE=int(os.getenv("BROKER_QUEUE_SIZE", 256)),
+        LIVE_FEED_BUFFER=int(os.getenv("LIVE_FEED_BUFFER", 256)),
+        LIVE_FEED_KEEPALIVE=int(os.getenv("LIVE_FEED_KEEPALIVE", 15)),
+        SYNC_LAG_SECONDS=int(os.getenv("SYNC_LAG_SECONDS", 2)),
     )
+    if config:
+        app.config.from_mapping(config)
 
     from app_dir.routes import all_bps
     for bp in all_bps:
         app.register_blueprint(bp)
 
+    # commit hooks that publish match and event writes to the broker, and
+    # the calendar's day buckets
+    from app_dir import feeds, matchdays
+
+    from app_dir.commands import all_commands
+    for command in all_commands:
+        app.cli.add_command(command)
+
     cors.init_app(app)
     mail.init_app(app)
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    response_cache.init_app(app)
+    day_buckets.init_app(app)
+    matchdays.init_app(app)
+    broker.init_app(app)
+    live_feed.init_app(app)
 
     return app
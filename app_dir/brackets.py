@@ -0,0 +1,206 @@
+from datetime import date, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import flag_modified
+from app_dir import db, response_cache
+from app_dir.models import Bracket, Match, Team
+
+
+class BracketError(ValueError):
+    pass
+
+
+def _tie(home=None, away=None):
+    return {
+        "home_team_id": home.id if home else None,
+        "home_team": home.name if home else None,
+        "away_team_id": away.id if away else None,
+        "away_team": away.name if away else None,
+        "match_id": None,
+        "home_score": None,
+        "away_score": None,
+        "status": None,
+        "home_penalties": None,
+        "away_penalties": None,
+        "winner_id": None,
+    }
+
+
+def generate_bracket(competition, team_ids, start_date, days_between=7, match_time="15:00"):
+    # team_ids are in seed order and fill a power-of-two draw; top seeds
+    # get the byes, byes advance straight away and every tie with two
+    # known teams gets a match
+    if (competition.types or "").lower() == "league":
+        raise BracketError("brackets can only be generated for knockout competitions")
+
+    if Bracket.query.filter_by(competition_id=competition.id).first():
+        raise BracketError("competition already has a bracket")
+
+    team_ids = list(dict.fromkeys(team_ids))
+    if len(team_ids) < 2:
+        raise BracketError("at least two teams are required")
+
+    teams = {team.id: team for team in Team.query.filter(Team.id.in_(team_ids))}
+    missing = [team_id for team_id in team_ids if team_id not in teams]
+    if missing:
+        raise BracketError(f"teams not found: {', '.join(map(str, missing))}")
+
+    try:
+        start = date.fromisoformat(start_date)
+    except (TypeError, ValueError):
+        raise BracketError("start_date must be YYYY-MM-DD")
+
+    if not Match.parse_kickoff(start_date, match_time):
+        raise BracketError("match_time must be HH:MM")
+
+    seeds = [teams[team_id] for team_id in team_ids]
+    order = [0]
+    while len(order) < len(seeds):
+        # standard draw order: 1v8, 4v5, 2v7, 3v6 ... keeps top seeds apart
+        size = len(order) * 2
+        order = [seat for seed in order for seat in (seed, size - 1 - seed)]
+    seeds += [None] * (len(order) - len(seeds))
+
+    rounds = [[_tie(seeds[order[i]], seeds[order[i + 1]]) for i in range(0, len(order), 2)]]
+    while len(rounds[-1]) > 1:
+        rounds.append([_tie() for _ in range(len(rounds[-1]) // 2)])
+
+    tree = {
+        "rounds": rounds,
+        "matches": {},
+        "start_date": start.isoformat(),
+        "days_between": days_between,
+        "match_time": match_time,
+    }
+    bracket = Bracket(competition_id=competition.id, tree=tree)
+    db.session.add(bracket)
+
+    for slot, tie in enumerate(rounds[0]):
+        if tie["home_team_id"] is None or tie["away_team_id"] is None:
+            tie["winner_id"] = tie["home_team_id"] or tie["away_team_id"]
+            _advance(bracket, 0, slot)
+    _schedule_ready(bracket, competition.id)
+
+    db.session.commit()
+    response_cache.invalidate("brackets", "matches")
+    return bracket
+
+
+def _is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def record_result(match, penalties=None):
+    # mirror a score write into the tree and push an FT winner into the
+    # next round; runs inside the caller's transaction, True if it changed.
+    # A tie level at FT is settled by a shoot-out, given as `penalties`
+    # (home, away) on this write or recorded by an earlier one
+    bracket = Bracket.query.filter_by(competition_id=match.competition_id).with_for_update().first()
+    position = bracket.tree["matches"].get(str(match.id)) if bracket is not None else None
+    if position is None:
+        if penalties is not None:
+            raise BracketError("penalties only apply to knockout bracket ties")
+        return False
+
+    home_goals, away_goals = match.home_score or 0, match.away_score or 0
+    if penalties is not None:
+        if not (match.is_finished and home_goals == away_goals):
+            raise BracketError("penalties only settle a tie level at full time")
+        if len(penalties) != 2 or not all(_is_count(value) for value in penalties) or penalties[0] == penalties[1]:
+            raise BracketError("penalties must be two different non-negative numbers")
+
+    round_index, slot = position
+    tie = bracket.tree["rounds"][round_index][slot]
+    tie["home_score"] = match.home_score
+    tie["away_score"] = match.away_score
+    tie["status"] = match.status
+    if penalties is not None:
+        tie["home_penalties"], tie["away_penalties"] = penalties
+    elif not (match.is_finished and home_goals == away_goals):
+        # a corrected score no longer needs the shoot-out
+        tie["home_penalties"] = tie["away_penalties"] = None
+
+    winner_id = None
+    if match.is_finished:
+        if home_goals == away_goals:
+            home_goals, away_goals = tie.get("home_penalties"), tie.get("away_penalties")
+            if home_goals is None or away_goals is None:
+                raise BracketError("a knockout tie level at full time needs home_penalties and away_penalties")
+        winner_id = match.home_team_id if home_goals > away_goals else match.away_team_id
+
+    if winner_id != tie["winner_id"]:
+        tie["winner_id"] = winner_id
+        _advance(bracket, round_index, slot)
+        _schedule_ready(bracket, match.competition_id)
+
+    flag_modified(bracket, "tree")
+    return True
+
+
+def with_team_names(tree):
+    # the tree keeps a copy of each seated team's name from when it was
+    # seated; serve the current names instead, from one query
+    team_ids = {tie[f"{side}_team_id"] for ties in tree["rounds"] for tie in ties
+                for side in ("home", "away") if tie[f"{side}_team_id"]}
+    names = dict(db.session.execute(
+        select(Team.id, Team.name).where(Team.id.in_(team_ids)).execution_options(include_deleted=True)
+    ).all()) if team_ids else {}
+    rounds = [[dict(tie) for tie in ties] for ties in tree["rounds"]]
+    for ties in rounds:
+        for tie in ties:
+            for side in ("home", "away"):
+                if tie[f"{side}_team_id"] in names:
+                    tie[f"{side}_team"] = names[tie[f"{side}_team_id"]]
+    return {**tree, "rounds": rounds}
+
+
+def _advance(bracket, round_index, slot):
+    # copy the tie's winner (or the lack of one) into its next-round seat
+    rounds = bracket.tree["rounds"]
+    if round_index + 1 >= len(rounds):
+        return
+
+    tie = rounds[round_index][slot]
+    side = "home" if slot % 2 == 0 else "away"
+    next_tie = rounds[round_index + 1][slot // 2]
+
+    match = db.session.get(Match, next_tie["match_id"]) if next_tie["match_id"] else None
+    if match is not None and (match.is_finished or match.is_live):
+        # the old winner has already played (or is playing) the next tie;
+        # a corrected result leaves its seat, score and match as they are
+        return
+
+    winner = db.session.get(Team, tie["winner_id"]) if tie["winner_id"] else None
+    next_tie[f"{side}_team_id"] = winner.id if winner else None
+    next_tie[f"{side}_team"] = winner.name if winner else None
+
+    if match is not None:
+        # a corrected result re-seats the next tie while it's unplayed
+        setattr(match, f"{side}_team_id", next_tie[f"{side}_team_id"])
+
+
+def _schedule_ready(bracket, competition_id):
+    tree = bracket.tree
+    start = date.fromisoformat(tree["start_date"])
+    new_matches = []
+    for round_index, ties in enumerate(tree["rounds"]):
+        match_date = (start + timedelta(days=round_index * tree["days_between"])).isoformat()
+        for slot, tie in enumerate(ties):
+            if tie["match_id"] or tie["winner_id"] or not (tie["home_team_id"] and tie["away_team_id"]):
+                continue
+            match = Match(
+                competition_id=competition_id,
+                home_team_id=tie["home_team_id"],
+                away_team_id=tie["away_team_id"],
+                match_date=match_date,
+                match_time=tree["match_time"],
+                status="scheduled",
+            )
+            db.session.add(match)
+            new_matches.append((match, tie, round_index, slot))
+
+    if new_matches:
+        db.session.flush()
+        for match, tie, round_index, slot in new_matches:
+            tie["match_id"] = match.id
+            tree["matches"][str(match.id)] = [round_index, slot]
+    flag_modified(bracket, "tree")
@@ -0,0 +1,261 @@
+import atexit, json, logging, os, socket, threading, time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class Message:
+    __slots__ = ("id", "topics", "event", "data", "key")
+
+    def __init__(self, id, topics, event, data, key=None):
+        self.id = id
+        self.topics = topics  # e.g. (("match", 7), ("competition", 2))
+        self.event = event
+        self.data = data
+        # messages with the same key may be merged for a slow subscriber
+        self.key = key
+
+    def to_bytes(self):
+        return json.dumps([self.id, self.topics, self.event, self.data, self.key],
+                          separators=(",", ":")).encode()
+
+    @classmethod
+    def from_bytes(cls, raw):
+        id, topics, event, data, key = json.loads(raw)
+        return cls(id, tuple(tuple(topic) for topic in topics), event, data,
+                   tuple(key) if key is not None else None)
+
+
+class Subscription:
+    # Bounded queue of messages for one consumer. A message with a coalesce
+    # key is merged into a pending one with the same key (a score delta
+    # absorbs the delta the consumer hasn't read yet); otherwise a full
+    # queue pushes out its oldest message and bumps `dropped`.
+
+    def __init__(self, broker, topics, maxsize):
+        self.broker = broker
+        self.topics = topics
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._pending = OrderedDict()  # coalesce key (or message id) -> Message
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+
+    def offer(self, message, merged=None):
+        # `merged` is shared across one delivery: subscribers holding the
+        # same pending message reuse one merged copy
+        with self._lock:
+            key = message.key if message.key is not None else message.id
+            previous = self._pending.pop(key, None)
+            if previous is not None:
+                combined = merged.get(previous.id) if merged is not None else None
+                if combined is None:
+                    combined = Message(message.id, message.topics, message.event,
+                                       {**previous.data, **message.data}, message.key)
+                    if merged is not None:
+                        merged[previous.id] = combined
+                message = combined
+            elif len(self._pending) >= self.maxsize:
+                self._pending.popitem(last=False)
+                self.dropped += 1
+            self._pending[key] = message
+            self._ready.notify()
+
+    def get(self, timeout=None):
+        # every pending message (oldest first), or [] after `timeout` seconds
+        with self._ready:
+            if not self._pending:
+                self._ready.wait(timeout)
+            messages = list(self._pending.values())
+            self._pending.clear()
+            return messages
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class LocalBackend:
+    # single process: a publish is delivered straight to this process's
+    # subscribers
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, message):
+        self.deliver(message)
+
+    def close(self):
+        pass
+
+
+class UnixSocketBackend:
+    # several workers on one host: each worker binds a datagram socket in
+    # `directory`, and a publish is delivered locally and sent to every
+    # other socket found there
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.path = None
+
+    def start(self, deliver):
+        self.deliver = deliver
+        if self.path is not None:
+            # started in the process this one was forked from: the sockets
+            # and the socket file are the parent's, and the relay thread
+            # didn't survive the fork
+            self._receiver.close()
+            self._sender.close()
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{os.getpid()}.sock")
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self._receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._receiver.bind(self.path)
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        threading.Thread(target=self._receive, name="broker-relay", daemon=True).start()
+        atexit.register(self.close)
+
+    def _receive(self):
+        while True:
+            try:
+                raw = self._receiver.recv(65536)
+            except OSError:
+                return
+            try:
+                self.deliver(Message.from_bytes(raw))
+            except Exception:
+                logger.exception("broker: bad relay message")
+
+    def publish(self, message):
+        self.deliver(message)
+        raw = message.to_bytes()
+        for name in os.listdir(self.directory):
+            peer = os.path.join(self.directory, name)
+            if peer == self.path or not name.endswith(".sock"):
+                continue
+            try:
+                self._sender.sendto(raw, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # the worker that bound it is gone
+                try:
+                    os.unlink(peer)
+                except OSError:
+                    pass
+            except BlockingIOError:
+                logger.warning("broker: %s is not keeping up, message %s dropped", name, message.id)
+
+    def close(self):
+        if self.path is None:
+            return
+        self._receiver.close()
+        self._sender.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+        self.path = None
+
+
+class Broker:
+    # In-process publish/subscribe keyed by topic tuples: ("match", id),
+    # ("competition", id), ("team", id). Subscriptions are bounded queues for
+    # stream consumers; listeners are callbacks run on every delivery.
+
+    def __init__(self, queue_size=256, backend=None):
+        self.queue_size = queue_size
+        self.backend = backend or LocalBackend()
+        # microsecond clock start keeps ids increasing across restarts and
+        # roughly ordered across workers
+        self._last_id = time.time_ns() // 1000
+        self._topics = {}     # topic -> set of subscriptions
+        self._listeners = []  # (topics or None for all, callback)
+        self._lock = threading.Lock()
+        self._starting = threading.Lock()
+        self._pid = None  # process the backend was started in
+
+    def init_app(self, app):
+        self.queue_size = app.config.get("BROKER_QUEUE_SIZE", self.queue_size)
+        if app.config.get("BROKER_BACKEND", "local") == "unix":
+            directory = app.config["BROKER_SOCKET_DIR"]
+            if not isinstance(self.backend, UnixSocketBackend) or self.backend.directory != directory:
+                if self._pid == os.getpid():
+                    self.backend.close()
+                self.backend = UnixSocketBackend(directory)
+                self._pid = None
+        # the backend starts in the process that first serves a request or
+        # publishes/subscribes: under a pre-fork server with the app
+        # preloaded that is each worker, not the master that built the app
+        app.before_request(self.start)
+        app.extensions["broker"] = self
+
+    def start(self):
+        # start the backend once per process; a forked worker inherits the
+        # parent's backend but not its relay thread, so it starts its own
+        if self._pid == os.getpid():
+            return
+        with self._starting:
+            if self._pid != os.getpid():
+                self.backend.start(self._deliver)
+                self._pid = os.getpid()
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def subscribe(self, *topics, maxsize=None):
+        self.start()
+        subscription = Subscription(self, topics, maxsize or self.queue_size)
+        with self._lock:
+            for topic in topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+
+    def listen(self, callback, *topics):
+        # callback(message) for messages on `topics`, or on every topic
+        with self._lock:
+            self._listeners.append((frozenset(topics) or None, callback))
+
+    def publish(self, topics, event, data, key=None):
+        self.start()
+        with self._lock:
+            self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+            message = Message(self._last_id, tuple(topics), event, data, key)
+        self.backend.publish(message)
+        return message.id
+
+    def _deliver(self, message):
+        with self._lock:
+            # relayed ids come from other workers' clocks
+            self._last_id = max(self._last_id, message.id)
+            # a subscriber on several of the message's topics gets it once
+            subscribers = set()
+            for topic in message.topics:
+                subscribers.update(self._topics.get(topic, ()))
+            listeners = [callback for topics, callback in self._listeners
+                         if topics is None or not topics.isdisjoint(message.topics)]
+
+        for callback in listeners:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("broker: listener failed on message %s", message.id)
+        merged = {}
+        for subscription in subscribers:
+            subscription.offer(message, merged)
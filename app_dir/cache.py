@@ -0,0 +1,170 @@
+import threading, time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request
+
+
+class ResponseCache:
+    # LRU + TTL cache of rendered GET/read responses. Entries are tagged with
+    # the tables they were built from; a write to one of those tables drops
+    # them (see BaseModel.save/update/soft_delete/delete).
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, tables, body, status, mimetype)
+        self._by_table = {}            # table -> set of keys
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_entries = app.config.get("RESPONSE_CACHE_SIZE", self.max_entries)
+        self.ttl = app.config.get("RESPONSE_CACHE_TTL", self.ttl)
+        app.extensions["response_cache"] = self
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, tables, body, status, mimetype, generation, ttl=None):
+        with self._lock:
+            # a write landed while this response was being built
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            expires_at = time.monotonic() + (ttl if ttl is not None else self.ttl)
+            self._entries[key] = (expires_at, tables, body, status, mimetype)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, *tables):
+        with self._lock:
+            self._generation += 1
+            for table in tables:
+                for key in self._by_table.pop(table, ()):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._by_table.clear()
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for table in entry[1]:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    def remember(self, key, tables, build, ttl=None):
+        # cached response for `key`, or build() it (any view return value)
+        # and keep it if it came back 200
+        entry = self.get(key)
+        if entry is not None:
+            return current_app.response_class(entry[2], status=entry[3], mimetype=entry[4])
+
+        generation = self.generation
+        response = current_app.make_response(build())
+        if response.status_code == 200 and not response.is_streamed:
+            self.set(key, tables, response.get_data(), response.status_code,
+                     response.mimetype, generation, ttl)
+        return response
+
+    def cached(self, *tables, ttl=None):
+        # route decorator: key is path + query string + request body
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = (
+                    request.path,
+                    tuple(sorted(request.args.items(multi=True))),
+                    request.get_data(),
+                )
+                return self.remember(key, tables, lambda: view(*args, **kwargs), ttl)
+            return wrapper
+        return decorator
+
+
+class DayBucketCache:
+    # date -> that day's fixtures, already grouped by competition. Buckets
+    # are dropped one day at a time (see app_dir/matchdays.py), so a score
+    # update only costs a reload of the day it was played on. Other workers
+    # hear about a drop through the broker; the TTL bounds how stale a
+    # bucket can get if that message never arrives.
+
+    def __init__(self, max_days=366, warm_days=7, ttl=60):
+        self.max_days = max_days
+        self.warm_days = warm_days
+        self.ttl = ttl
+        self._buckets = OrderedDict()  # date -> (expires_at, list of competition groups)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_days = app.config.get("CALENDAR_CACHE_DAYS", self.max_days)
+        self.warm_days = app.config.get("CALENDAR_WARM_DAYS", self.warm_days)
+        self.ttl = app.config.get("CALENDAR_CACHE_TTL", self.ttl)
+        app.extensions["day_buckets"] = self
+
+    def get_many(self, days):
+        # cached buckets for `days`, plus the days that still need loading
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for day in days:
+                entry = self._buckets.get(day)
+                if entry is not None and entry[0] < now:
+                    del self._buckets[day]
+                    entry = None
+                if entry is None:
+                    missing.append(day)
+                else:
+                    self._buckets.move_to_end(day)
+                    found[day] = entry[1]
+        return found, missing
+
+    def fill(self, buckets, generation):
+        with self._lock:
+            # a fixture changed while these were being loaded
+            if generation != self._generation:
+                return
+            expires_at = time.monotonic() + self.ttl
+            for day, bucket in buckets.items():
+                self._buckets[day] = (expires_at, bucket)
+                self._buckets.move_to_end(day)
+            while len(self._buckets) > self.max_days:
+                self._buckets.popitem(last=False)
+
+    def invalidate(self, *days):
+        with self._lock:
+            self._generation += 1
+            for day in days:
+                self._buckets.pop(day, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._buckets.clear()
+
+    @property
+    def generation(self):
+        return self._generation
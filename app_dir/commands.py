@@ -0,0 +1,362 @@
+import click, os, random, statistics, tempfile, threading, time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from flask.cli import AppGroup
+from flask_migrate import upgrade
+from sqlalchemy import event, insert
+from app_dir import BASE_DIR, db, fixtures, form, match_events, response_cache, standings
+from app_dir.broker import Broker
+from app_dir.models import Competition, Event, Match, MatchLineup, Player, Stats, Standing, Team, TeamSquad
+from app_dir.serializers import serializer_for
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(BASE_DIR), "migrations")
+
+
+@contextmanager
+def scratch_app(migrated=False):
+    # a throwaway app on a temporary SQLite file, so benches never write
+    # to the configured database; migrated=True builds the schema from the
+    # migration history instead of the models
+    from app_dir import create_app
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(directory, 'bench.db')}"})
+        with app.app_context():
+            if migrated:
+                upgrade(directory=MIGRATIONS_DIR)
+            else:
+                db.create_all()
+            try:
+                yield app
+            finally:
+                db.session.remove()
+                db.engine.dispose()
+        response_cache.clear()
+
+
+@contextmanager
+def count_statements():
+    # every (SQL, parameters) sent to the current app's engine inside the block
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+
+def seed_fixtures(count, teams, competitions=1, finished=False, seed=0):
+    # `count` fixtures an hour apart between `teams` teams, bulk inserted;
+    # finished ones get random FT scores. Returns the inserted rows.
+    rng = random.Random(seed)
+    competition_rows = [Competition(name=f"Bench League {n}", types="league") for n in range(competitions)]
+    team_rows = [Team(name=f"Bench Team {n}") for n in range(teams)]
+    db.session.add_all(competition_rows + team_rows)
+    db.session.flush()
+
+    first_kickoff = datetime(2026, 1, 3, 15, 0)
+    rows = []
+    for n in range(count):
+        home, away = rng.sample(team_rows, 2)
+        kickoff_at = first_kickoff + timedelta(hours=n)
+        row = {
+            "competition_id": competition_rows[n % competitions].id,
+            "home_team_id": home.id,
+            "away_team_id": away.id,
+            "home_score": 0,
+            "away_score": 0,
+            "status": "scheduled",
+            "match_date": kickoff_at.strftime("%Y-%m-%d"),
+            "match_time": kickoff_at.strftime("%H:%M"),
+            "kickoff_at": kickoff_at,
+        }
+        row["pair_low_id"], row["pair_high_id"] = Match.team_pair(home.id, away.id)
+        if finished:
+            row.update(status="FT", home_score=rng.randint(0, 4), away_score=rng.randint(0, 4))
+        rows.append(row)
+    # bulk insert skips the mapper hooks, hence the derived columns above
+    db.session.execute(insert(Match), rows)
+    db.session.commit()
+    # start the measurement with nothing in the identity map
+    db.session.remove()
+    return rows
+
+
+standings_cli = AppGroup("standings", help="Maintain competition standings.")
+
+
+@standings_cli.command("rebuild")
+@click.argument("competition_id", type=int)
+def rebuild_standings(competition_id):
+    """Recompute a competition's standings from its finished matches."""
+    if not Competition.query.filter_by(id=competition_id).first():
+        raise click.ClickException(f"Competition {competition_id} not found")
+
+    teams = standings.rebuild(competition_id)
+    click.echo(f"Rebuilt standings for {teams} teams")
+
+
+@standings_cli.command("bench")
+@click.option("--matches", default=10000, show_default=True, help="Finished matches in the competition.")
+@click.option("--teams", default=20, show_default=True, help="Teams in the competition.")
+@click.option("--max-seconds", default=1.0, show_default=True, help="Fail when the rebuild takes longer.")
+def bench_standings(matches, teams, max_seconds):
+    """Time a full standings rebuild on a scratch database and check its totals."""
+    with scratch_app():
+        rows = seed_fixtures(matches, teams=teams, finished=True)
+        competition_id = rows[0]["competition_id"]
+
+        # independent recount of the seeded results
+        expected = {}
+        for row in rows:
+            for team_id, scored, conceded in (
+                (row["home_team_id"], row["home_score"], row["away_score"]),
+                (row["away_team_id"], row["away_score"], row["home_score"]),
+            ):
+                delta = expected.setdefault(team_id, [0] * len(standings.COUNTERS))
+                standings.add_result(delta, scored, conceded)
+
+        started = time.perf_counter()
+        rebuilt = standings.rebuild(competition_id)
+        elapsed = time.perf_counter() - started
+
+        actual = {
+            standing.team_id: [getattr(standing, name) for name in standings.COUNTERS]
+            for standing in Standing.query.filter_by(competition_id=competition_id)
+        }
+
+    click.echo(f"{matches} matches, {rebuilt} teams: rebuilt in {elapsed:.3f}s")
+    if actual != expected:
+        wrong = sorted(team_id for team_id in expected.keys() | actual.keys()
+                       if actual.get(team_id) != expected.get(team_id))
+        raise click.ClickException(f"rebuilt totals differ from the recount for teams {wrong}")
+    if elapsed > max_seconds:
+        raise click.ClickException(f"rebuild took {elapsed:.3f}s, over the {max_seconds}s budget")
+    click.echo("ok: totals match the recount")
+
+
+fixtures_cli = AppGroup("fixtures", help="Schedule competition fixtures.")
+
+
+@fixtures_cli.command("generate")
+@click.argument("competition_id", type=int)
+@click.option("--team", "team_ids", type=int, multiple=True, required=True, help="Team id (repeat for each team).")
+@click.option("--start", "start_date", required=True, help="First matchday, YYYY-MM-DD.")
+@click.option("--days-between", default=7, show_default=True, help="Days between matchdays.")
+@click.option("--time", "match_time", default="15:00", show_default=True, help="Kick-off time.")
+@click.option("--single-round", is_flag=True, help="Play each pairing once instead of home and away.")
+def generate_fixtures(competition_id, team_ids, start_date, days_between, match_time, single_round):
+    """Create a full round-robin schedule for a league competition."""
+    competition = Competition.query.filter_by(id=competition_id).first()
+    if not competition:
+        raise click.ClickException(f"Competition {competition_id} not found")
+
+    try:
+        rows = fixtures.generate_league_fixtures(competition, team_ids, start_date, days_between,
+                                                 match_time, double_round=not single_round)
+    except fixtures.FixtureError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Created {len(rows)} fixtures")
+
+
+form_cli = AppGroup("form", help="Maintain team form guides.")
+
+
+@form_cli.command("rebuild")
+def rebuild_form():
+    """Recompute every team's recent results from the finished matches."""
+    teams = form.rebuild()
+    click.echo(f"Rebuilt form guides for {teams} teams")
+
+
+broker_cli = AppGroup("broker", help="Inspect the live update broker.")
+
+
+@broker_cli.command("bench")
+@click.option("--subscribers", default=10000, show_default=True, help="Subscriptions on the topic.")
+@click.option("--readers", default=16, show_default=True, help="Subscribers drained by a thread; the rest never read.")
+@click.option("--messages", default=200, show_default=True, help="Score updates to publish.")
+def bench_broker(subscribers, readers, messages):
+    """Measure publish-to-deliver latency on a standalone in-process broker."""
+    bench = Broker()
+    topic = ("match", 1)
+    idle = [bench.subscribe(topic) for _ in range(subscribers - readers)]
+    waits = []
+    done = threading.Event()
+
+    def read(subscription):
+        while not done.is_set():
+            for message in subscription.get(0.1):
+                waits.append(time.perf_counter() - message.data["sent"])
+
+    threads = [threading.Thread(target=read, args=(bench.subscribe(topic),)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+
+    fan_out = []
+    for home_score in range(messages):
+        sent = time.perf_counter()
+        # same coalesce key as real score deltas, so idle queues stay at one entry
+        bench.publish([topic], "score", {"home_score": home_score, "sent": sent}, ("score", 1))
+        fan_out.append(time.perf_counter() - sent)
+        time.sleep(0.005)
+    done.set()
+    for thread in threads:
+        thread.join()
+
+    def ms(samples, q):
+        return statistics.quantiles(samples, n=100)[q - 1] * 1000
+
+    click.echo(f"{subscribers} subscribers, {messages} messages, {len(idle)} idle queues "
+               f"holding {sum(len(subscription._pending) for subscription in idle)} entries")
+    click.echo(f"publish (all queues filled): p50 {ms(fan_out, 50):.2f} ms  p99 {ms(fan_out, 99):.2f} ms")
+    click.echo(f"publish -> reader wake-up:   p50 {ms(waits, 50):.2f} ms  p99 {ms(waits, 99):.2f} ms")
+
+
+matches_cli = AppGroup("matches", help="Check the match listings.")
+
+
+@matches_cli.command("bench")
+@click.option("--small", default=40, show_default=True, help="Fixtures in the first run (less than a page).")
+@click.option("--large", default=4000, show_default=True, help="Fixtures in the second run.")
+def bench_matches(small, large):
+    """Fail unless GET /teams/get_matches runs the same number of SQL statements at both fixture counts."""
+    counts = {}
+    for fixture_count in (small, large):
+        with scratch_app() as app:
+            # teams and competitions grow with the fixtures, so a per-row
+            # lazy load can't hide behind the identity map
+            seed_fixtures(fixture_count, teams=max(2, fixture_count // 10),
+                          competitions=max(1, fixture_count // 100))
+            with count_statements() as statements:
+                response = app.test_client().get("/teams/get_matches?limit=200")
+            if response.status_code != 200:
+                raise click.ClickException(f"/teams/get_matches returned {response.status_code}")
+            served = len(response.get_json()["matches"])
+            counts[fixture_count] = len(statements)
+        click.echo(f"{fixture_count} fixtures: {served} served in {len(statements)} statements")
+
+    if counts[small] != counts[large]:
+        raise click.ClickException(
+            f"statement count grew with the fixture count: {counts[small]} at {small}, {counts[large]} at {large}")
+    click.echo("ok: statement count is constant")
+
+
+serializers_cli = AppGroup("serializers", help="Check the model serializers.")
+
+
+def legacy_to_dict(obj, exclude=None):
+    # BaseModel.to_dict before app_dir.serializers, kept as the baseline
+    exclude = exclude or []
+    data = {}
+    for column in obj.__table__.columns:
+        if column.name in exclude:
+            continue
+        value = getattr(obj, column.name)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        data[column.name] = value
+    return data
+
+
+@serializers_cli.command("bench")
+@click.option("--rows", default=100000, show_default=True, help="Match rows to serialize.")
+@click.option("--repeat", default=3, show_default=True, help="Runs per serializer; the best one is reported.")
+def bench_serializers(rows, repeat):
+    """Time the cached Match serializer against the old to_dict on loaded rows."""
+    with scratch_app():
+        seed_fixtures(rows, teams=20)
+        matches = Match.query.all()
+        serialize = serializer_for(Match)
+
+        for match in matches:
+            if serialize(match) != legacy_to_dict(match):
+                raise click.ClickException(f"serializers disagree on match {match.id}")
+
+        def best(function):
+            runs = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for match in matches:
+                    function(match)
+                runs.append(time.perf_counter() - started)
+            return min(runs)
+
+        legacy, cached = best(legacy_to_dict), best(serialize)
+    click.echo(f"{rows} rows: to_dict {legacy:.2f}s  serializer_for {cached:.2f}s  ({legacy / cached:.1f}x)")
+
+
+indexes_cli = AppGroup("indexes", help="Check the query plans of the hot read paths.")
+
+
+def hot_queries():
+    # (name, callable) for the read paths the foreign-key indexes exist for;
+    # each callable runs the same ORM code the routes do
+    competition = Competition(name="Plan League", types="league")
+    home, away = Team(name="Plan Home"), Team(name="Plan Away")
+    player = Player(first_name="Plan", last_name="Player")
+    db.session.add_all([competition, home, away, player])
+    db.session.flush()
+    match = Match(competition_id=competition.id, home_team_id=home.id, away_team_id=away.id,
+                  match_date="2026-01-03", match_time="15:00")
+    db.session.add_all([match, TeamSquad(team_id=home.id, player_id=player.id, season="2026")])
+    db.session.flush()
+    db.session.add_all([
+        Event(match_id=match.id, team_id=home.id, player_id=player.id, event_type="goal", event_time="12"),
+        Stats(match_id=match.id, team_id=home.id),
+        MatchLineup(match_id=match.id, team_id=home.id, player_id=player.id),
+    ])
+    db.session.commit()
+    competition_id, team_id, match_id = competition.id, home.id, match.id
+    db.session.remove()
+
+    return [
+        ("team fixtures", lambda: Team.get_profile(team_id)),
+        ("competition buckets", lambda: Match.group_by_competition([competition_id])),
+        ("competition upcoming buckets", lambda: Match.group_by_competition([competition_id], upcoming=5)),
+        ("competition fixture counts", lambda: Match.count_by_competition([competition_id])),
+        ("squad by team and season", lambda: TeamSquad.query.filter_by(team_id=team_id, season="2026").all()),
+        ("events by match", lambda: match_events.timeline(match_id)),
+        ("stats by match", lambda: Stats.query.filter_by(match_id=match_id).all()),
+        ("lineups by match", lambda: MatchLineup.query.filter_by(match_id=match_id).all()),
+    ]
+
+
+def unindexed_steps(statement, parameters):
+    # plan lines that scan a table without an index; scans of subqueries
+    # and CTEs SQLite materialized are fine
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [detail for _, _, _, detail in plan
+            if detail.startswith("SCAN ") and detail.split()[1] in db.metadata.tables
+            and "USING" not in detail and "INDEX" not in detail]
+
+
+@indexes_cli.command("check")
+def check_indexes():
+    """Fail unless every hot query's SQLite plan is a SEARCH or USING INDEX, on a migrated scratch database."""
+    failures = 0
+    with scratch_app(migrated=True):
+        for name, run in hot_queries():
+            with count_statements() as statements:
+                run()
+            db.session.remove()
+            failed = 0
+            for statement, parameters in statements:
+                steps = unindexed_steps(statement, parameters)
+                if steps:
+                    failed += 1
+                    click.echo(f"FAIL {name}: {'; '.join(steps)}\n    {' '.join(statement.split())}")
+            if not failed:
+                click.echo(f"ok   {name} ({len(statements)} statements)")
+            failures += failed
+
+    if failures:
+        raise click.ClickException(f"{failures} statements read a table without an index")
+
+
+all_commands = [standings_cli, fixtures_cli, form_cli, broker_cli, matches_cli, serializers_cli, indexes_cli]
@@ -0,0 +1,95 @@
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app_dir import broker
+from app_dir.live import LIVE_FIELDS
+from app_dir.models import Event, Match, Team
+
+EVENT_FIELDS = ("id", "match_id", "team_id", "player_id", "event_type", "event_time")
+
+
+def match_topics(match_id, competition_id, *team_ids):
+    topics = [("match", match_id)]
+    if competition_id is not None:
+        topics.append(("competition", competition_id))
+    topics.extend(("team", team_id) for team_id in dict.fromkeys(team_ids) if team_id is not None)
+    return topics
+
+
+def _score_delta(state):
+    delta = {}
+    for name in LIVE_FIELDS:
+        history = state.attrs[name].history
+        if history.added and history.added[0] not in history.deleted:
+            delta[name] = history.added[0]
+    return delta
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_messages(session, flush_context):
+    # build the broker messages for this flush while attribute history is
+    # still there; they go out once the transaction commits
+    messages = session.info.setdefault("broker_messages", [])
+    scores = []
+    new_events = []
+    for obj in session.dirty:
+        if isinstance(obj, Match):
+            delta = _score_delta(inspect(obj))
+            if delta:
+                scores.append((obj, delta))
+    for obj in session.new:
+        if isinstance(obj, Match) and obj.is_live:
+            scores.append((obj, {name: getattr(obj, name) for name in LIVE_FIELDS}))
+        elif isinstance(obj, Event) and obj.match_id is not None:
+            new_events.append(obj)
+
+    # a match going live carries everything a scoreboard needs to list it,
+    # so no worker has to read it back
+    going_live = [obj for obj, delta in scores if "status" in delta and obj.is_live]
+    if going_live:
+        with session.no_autoflush:
+            names = dict(session.execute(
+                select(Team.id, Team.name)
+                .where(Team.id.in_({team_id for obj in going_live
+                                    for team_id in (obj.home_team_id, obj.away_team_id)}))
+                .execution_options(include_deleted=True)
+            ).all())
+    for obj, delta in scores:
+        data = {"match_id": obj.id, "competition_id": obj.competition_id, **delta}
+        if obj in going_live:
+            data.update({name: getattr(obj, name) for name in LIVE_FIELDS})
+            data.update(
+                home_team_id=obj.home_team_id,
+                away_team_id=obj.away_team_id,
+                home_team=names.get(obj.home_team_id),
+                away_team=names.get(obj.away_team_id),
+                kickoff_at=obj.kickoff_at.isoformat() if obj.kickoff_at else None,
+            )
+        messages.append((
+            match_topics(obj.id, obj.competition_id, obj.home_team_id, obj.away_team_id),
+            "score", data, ("score", obj.id),
+        ))
+    if not new_events:
+        return
+
+    with session.no_autoflush:
+        competitions = dict(session.execute(
+            select(Match.id, Match.competition_id)
+            .where(Match.id.in_({obj.match_id for obj in new_events}))
+            .execution_options(include_deleted=True)
+        ).all())
+    for obj in new_events:
+        competition_id = competitions.get(obj.match_id)
+        data = {name: getattr(obj, name) for name in EVENT_FIELDS}
+        data["competition_id"] = competition_id
+        messages.append((match_topics(obj.match_id, competition_id, obj.team_id), "event", data, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_messages(session):
+    for topics, event_name, data, key in session.info.pop("broker_messages", ()):
+        broker.publish(topics, event_name, data, key)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_messages(session, previous_transaction):
+    session.info.pop("broker_messages", None)
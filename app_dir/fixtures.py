@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+from sqlalchemy import insert
+from app_dir import db, matchdays, response_cache
+from app_dir.models import Match, Team
+
+
+class FixtureError(ValueError):
+    pass
+
+
+def round_robin(team_ids, double_round=True):
+    # circle method: team 0 stays put, the rest rotate one seat per
+    # matchday; an odd field gets a bye seat. Returns a list of matchdays,
+    # each a list of (home_team_id, away_team_id).
+    seats = list(team_ids)
+    if len(seats) % 2:
+        seats.append(None)
+    size = len(seats)
+
+    matchdays = []
+    for day in range(size - 1):
+        pairs = []
+        for i in range(size // 2):
+            home, away = seats[i], seats[size - 1 - i]
+            if home is None or away is None:
+                continue
+            # alternate venues so nobody is at home every week
+            if (i == 0 and day % 2) or (i > 0 and i % 2):
+                home, away = away, home
+            pairs.append((home, away))
+        matchdays.append(pairs)
+        seats = [seats[0], seats[-1], *seats[1:-1]]
+
+    if double_round:
+        matchdays += [[(away, home) for home, away in pairs] for pairs in matchdays]
+    return matchdays
+
+
+def generate_league_fixtures(competition, team_ids, start_date, days_between=7,
+                             match_time="15:00", double_round=True):
+    # whole season in one multi-row INSERT and one commit
+    if (competition.types or "").lower() != "league":
+        raise FixtureError("fixtures can only be generated for league competitions")
+
+    team_ids = list(dict.fromkeys(team_ids))
+    if len(team_ids) < 2:
+        raise FixtureError("at least two teams are required")
+
+    found = {team_id for (team_id,) in db.session.query(Team.id).filter(Team.id.in_(team_ids))}
+    missing = [team_id for team_id in team_ids if team_id not in found]
+    if missing:
+        raise FixtureError(f"teams not found: {', '.join(map(str, missing))}")
+
+    if Match.query.filter_by(competition_id=competition.id).first():
+        raise FixtureError("competition already has fixtures")
+
+    try:
+        start = date.fromisoformat(start_date)
+    except (TypeError, ValueError):
+        raise FixtureError("start_date must be YYYY-MM-DD")
+
+    if not Match.parse_kickoff(start_date, match_time):
+        raise FixtureError("match_time must be HH:MM")
+
+    rows = []
+    for day, pairs in enumerate(round_robin(team_ids, double_round)):
+        match_date = (start + timedelta(days=day * days_between)).isoformat()
+        for home_team_id, away_team_id in pairs:
+            pair_low_id, pair_high_id = Match.team_pair(home_team_id, away_team_id)
+            rows.append({
+                "competition_id": competition.id,
+                "home_team_id": home_team_id,
+                "away_team_id": away_team_id,
+                "match_date": match_date,
+                "match_time": match_time,
+                "kickoff_at": Match.parse_kickoff(match_date, match_time),
+                "status": "scheduled",
+                # bulk inserts skip mapper events, so derived columns are set here
+                "pair_low_id": pair_low_id,
+                "pair_high_id": pair_high_id,
+            })
+
+    db.session.execute(insert(Match), rows)
+    db.session.commit()
+    response_cache.invalidate("matches")
+    matchdays.invalidate_days({row["kickoff_at"].date() for row in rows})
+    return rows
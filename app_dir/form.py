@@ -0,0 +1,97 @@
+from sqlalchemy import delete, func, insert, or_
+from app_dir import db, response_cache
+from app_dir.models import Match, TeamForm
+
+FORM_LENGTH = 5
+
+
+def _entry(match, team_id):
+    at_home = match.home_team_id == team_id
+    goals_for = int((match.home_score if at_home else match.away_score) or 0)
+    goals_against = int((match.away_score if at_home else match.home_score) or 0)
+    if goals_for > goals_against:
+        result = "W"
+    elif goals_for < goals_against:
+        result = "L"
+    else:
+        result = "D"
+    return {
+        "match_id": match.id,
+        "kickoff_at": match.kickoff_at.isoformat(),
+        "opponent_id": match.away_team_id if at_home else match.home_team_id,
+        "venue": "H" if at_home else "A",
+        "goals_for": goals_for,
+        "goals_against": goals_against,
+        "result": result,
+    }
+
+
+def _teams(match):
+    # distinct sides; older rows include a team "playing itself"
+    return [team_id for team_id in dict.fromkeys((match.home_team_id, match.away_team_id))
+            if team_id is not None]
+
+
+def _newest_first(entries):
+    return sorted(entries, key=lambda entry: (entry["kickoff_at"], entry["match_id"]), reverse=True)
+
+
+def _finished(query):
+    return query.filter(func.lower(Match.status) == "ft").order_by(Match.kickoff_at.desc(), Match.id.desc())
+
+
+def _recent_results(team_id):
+    matches = _finished(Match.query.filter(
+        or_(Match.home_team_id == team_id, Match.away_team_id == team_id))).limit(FORM_LENGTH)
+    return [_entry(match, team_id) for match in matches]
+
+
+def apply_result_change(match, before):
+    # slide the match in or out of both teams' windows, in the caller's
+    # transaction; `before` is a standings.snapshot taken ahead of the write
+    after = (match.is_finished, int(match.home_score or 0), int(match.away_score or 0))
+    if after == before or not (before[0] or after[0]):
+        return False
+
+    for team_id in _teams(match):
+        form = TeamForm.get_or_create(team_id)
+        entries = [entry for entry in form.recent if entry["match_id"] != match.id]
+        if match.is_finished:
+            entries = _newest_first(entries + [_entry(match, team_id)])[:FORM_LENGTH]
+        elif len(form.recent) == FORM_LENGTH and len(entries) < FORM_LENGTH:
+            # a result left a full window; the one that slides back in is
+            # only in the matches table
+            entries = _recent_results(team_id)
+        form.recent = entries
+    return True
+
+
+def rebuild():
+    # recompute every team's window in one pass over the finished matches
+    windows = {}
+    matches = _finished(db.session.query(
+        Match.id, Match.kickoff_at, Match.home_team_id, Match.away_team_id,
+        Match.home_score, Match.away_score))
+    for match in matches.yield_per(1000):
+        for team_id in _teams(match):
+            window = windows.setdefault(team_id, [])
+            if len(window) < FORM_LENGTH:
+                window.append(_entry(match, team_id))
+
+    db.session.execute(delete(TeamForm))
+    if windows:
+        db.session.execute(insert(TeamForm), [
+            {"team_id": team_id, "recent": window} for team_id, window in windows.items()
+        ])
+    db.session.commit()
+    response_cache.invalidate("team_forms")
+    return len(windows)
+
+
+def form_by_team(team_ids):
+    # {team_id: "WWDLW"} (newest first) for a page of teams, in one query
+    forms = {team_id: "" for team_id in team_ids}
+    rows = db.session.query(TeamForm.team_id, TeamForm.recent).filter(TeamForm.team_id.in_(team_ids))
+    for team_id, recent in rows:
+        forms[team_id] = "".join(entry["result"] for entry in recent)
+    return forms
@@ -0,0 +1,131 @@
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app_dir import db
+from app_dir.models import Event, Match, Player, PlayerTally, Team
+
+# Event.event_type -> PlayerTally counter
+TALLY_COLUMNS = {
+    "goal": "goals",
+    "assist": "assists",
+    "yellow_card": "yellow_cards",
+    "red_card": "red_cards",
+    "substitution": "substitutions",
+}
+LEADERBOARD_STATS = ("goals", "assists", "yellow_cards", "red_cards")
+
+
+def _previous(state, name):
+    history = state.attrs[name].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(state.obj(), name)
+
+
+def _counted(match_id, player_id, event_type, is_deleted):
+    if is_deleted or not match_id or not player_id or event_type not in TALLY_COLUMNS:
+        return None
+    return (match_id, player_id, TALLY_COLUMNS[event_type])
+
+
+@event.listens_for(Session, "before_flush")
+def _tally_events(session, flush_context, instances):
+    # keep player_tallies in step with the events written in this flush:
+    # new events count +1, deleted or soft-deleted ones -1, edited ones
+    # move from their old counter to the new one
+    deltas = {}
+    teams = {}
+
+    def count(key, sign, team_id=None):
+        if key is not None:
+            deltas[key] = deltas.get(key, 0) + sign
+            if team_id and sign > 0:
+                teams[key[:2]] = team_id
+
+    for obj in session.new:
+        if isinstance(obj, Event):
+            count(_counted(obj.match_id, obj.player_id, obj.event_type, obj.is_deleted), 1, obj.team_id)
+
+    for obj in session.deleted:
+        if isinstance(obj, Event):
+            state = inspect(obj)
+            count(_counted(*(_previous(state, name) for name in
+                             ("match_id", "player_id", "event_type", "is_deleted"))), -1)
+
+    for obj in session.dirty:
+        if isinstance(obj, Event) and session.is_modified(obj):
+            state = inspect(obj)
+            old = _counted(*(_previous(state, name) for name in
+                             ("match_id", "player_id", "event_type", "is_deleted")))
+            new = _counted(obj.match_id, obj.player_id, obj.event_type, obj.is_deleted)
+            if old != new:
+                count(old, -1)
+                count(new, 1, obj.team_id)
+
+    deltas = {key: value for key, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    with session.no_autoflush:
+        competitions = dict(session.execute(
+            select(Match.id, Match.competition_id)
+            .where(Match.id.in_({match_id for match_id, _, _ in deltas}))
+            .execution_options(include_deleted=True)
+        ).all())
+
+        by_player = {}
+        for (match_id, player_id, column), value in deltas.items():
+            competition_id = competitions.get(match_id)
+            if competition_id is None:
+                continue
+            counters = by_player.setdefault((competition_id, player_id), {})
+            counters[column] = counters.get(column, 0) + value
+            if (match_id, player_id) in teams:
+                counters.setdefault("team_id", teams[(match_id, player_id)])
+
+        if not by_player:
+            return
+
+        tallies = {
+            (tally.competition_id, tally.player_id): tally
+            for tally in PlayerTally.with_deleted().filter(
+                PlayerTally.competition_id.in_({key[0] for key in by_player}),
+                PlayerTally.player_id.in_({key[1] for key in by_player}),
+            )
+        }
+
+    for (competition_id, player_id), counters in by_player.items():
+        team_id = counters.pop("team_id", None)
+        tally = tallies.get((competition_id, player_id))
+        if tally is None:
+            tally = PlayerTally(competition_id=competition_id, player_id=player_id, team_id=team_id,
+                                **{column: 0 for column in TALLY_COLUMNS.values()})
+            for column, value in counters.items():
+                setattr(tally, column, value)
+            session.add(tally)
+            continue
+
+        if team_id:
+            tally.team_id = team_id
+        for column, value in counters.items():
+            setattr(tally, column, getattr(PlayerTally, column) + value)
+
+
+def leaderboard(competition_id, stat, limit=10):
+    column = getattr(PlayerTally, stat)
+    rows = db.session.execute(
+        select(
+            PlayerTally.player_id,
+            Player.first_name,
+            Player.last_name,
+            Player.photo,
+            PlayerTally.team_id,
+            Team.name.label("team_name"),
+            column.label(stat),
+        )
+        .join(Player, Player.id == PlayerTally.player_id)
+        .outerjoin(Team, Team.id == PlayerTally.team_id)
+        .where(PlayerTally.competition_id == competition_id, column > 0)
+        .order_by(column.desc(), PlayerTally.player_id.desc())
+        .limit(limit)
+    )
+    return [dict(row._mapping) for row in rows]
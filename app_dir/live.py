@@ -0,0 +1,91 @@
+import json, threading
+from collections import OrderedDict, deque
+
+# what a score write can change, and so what the stream carries
+LIVE_FIELDS = ("home_score", "away_score", "status", "added_time", "extra_time")
+
+
+def match_state(match):
+    return {name: getattr(match, name) for name in LIVE_FIELDS}
+
+
+def format_event(data, event=None, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class LiveFeed:
+    # Server-Sent Events streams on top of the broker. Every channel
+    # (a broker topic such as ("match", id)) keeps its last `buffer_size`
+    # messages so a reconnecting client can replay from Last-Event-ID.
+
+    def __init__(self, broker, buffer_size=256, max_channels=1024, keepalive=15):
+        self.broker = broker
+        self.buffer_size = buffer_size
+        self.max_channels = max_channels
+        self.keepalive = keepalive
+        self._channels = OrderedDict()  # channel -> (messages deque, id of the last evicted message)
+        self._lock = threading.Lock()
+        broker.listen(self._record)
+
+    def init_app(self, app):
+        self.buffer_size = app.config.get("LIVE_FEED_BUFFER", self.buffer_size)
+        self.keepalive = app.config.get("LIVE_FEED_KEEPALIVE", self.keepalive)
+        app.extensions["live_feed"] = self
+
+    @property
+    def last_id(self):
+        return self.broker.last_id
+
+    def _record(self, message):
+        with self._lock:
+            for channel in message.topics:
+                messages, evicted = self._channels.pop(channel, (deque(maxlen=self.buffer_size), 0))
+                if len(messages) == messages.maxlen:
+                    evicted = messages[0].id
+                messages.append(message)
+                self._channels[channel] = (messages, evicted)
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+
+    def _since(self, channel, last_id):
+        # (buffered messages after last_id, whether some were already evicted)
+        with self._lock:
+            messages, evicted = self._channels.get(channel, ((), 0))
+            return [message for message in messages if message.id > last_id], last_id < evicted
+
+    def stream(self, channel, last_id, first=None):
+        # generator of SSE frames after last_id; blocks on a broker
+        # subscription between messages and sends a comment every
+        # `keepalive` seconds so proxies keep the connection open
+        subscription = self.broker.subscribe(channel)
+        try:
+            yield "retry: 3000\n\n"
+            if first:
+                yield first
+
+            pending, gap = self._since(channel, last_id)
+            dropped = 0
+            while True:
+                if gap:
+                    # older than the replay buffer: the client has to refetch
+                    yield format_event({"last_event_id": last_id}, "reset")
+                for message in pending:
+                    if message.id > last_id:
+                        yield format_event(message.data, message.event, message.id)
+                        last_id = message.id
+
+                pending, gap = subscription.get(self.keepalive), False
+                if subscription.dropped != dropped:
+                    # this client fell behind its queue; catch up from the buffer
+                    dropped = subscription.dropped
+                    pending, gap = self._since(channel, last_id)
+                if not pending:
+                    yield ": keepalive\n\n"
+        finally:
+            subscription.close()
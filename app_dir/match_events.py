@@ -0,0 +1,173 @@
+import re
+from sqlalchemy import func, update
+from sqlalchemy.orm.attributes import flag_modified
+from app_dir import db, standings
+from app_dir.models import EVENT_TYPES, Event, Match, Player, Stats, Team
+from app_dir.results import save_result
+
+MAX_BATCH = 500
+EVENT_TIME = re.compile(r"^\d{1,3}(\+\d{1,2})?$")  # "45", "90+3"
+# Stats columns a batch adds to; possession is a percentage and is replaced
+STATS_COUNTERS = ("shots_on_target", "shots_off_target", "corners", "fouls",
+                  "yellow_cards", "red_cards", "saves", "offsides")
+
+
+class IngestError(ValueError):
+    def __init__(self, errors):
+        super().__init__("invalid batch")
+        self.errors = errors  # [{"section", "index", "error"}]
+
+
+def _is_id(value):
+    # JSON ids are plain ints; bools would pass as 0/1 and lists or objects
+    # can't be looked up in a set
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _validate(match, events, stats):
+    errors = []
+
+    def error(section, index, message):
+        errors.append({"section": section, "index": index, "error": message})
+
+    if not isinstance(events, list) or not isinstance(stats, list):
+        error("batch", None, "events and stats must be lists")
+    elif not events and not stats:
+        error("batch", None, "nothing to ingest")
+    elif len(events) + len(stats) > MAX_BATCH:
+        error("batch", None, f"at most {MAX_BATCH} events and stats per batch")
+    if errors:
+        raise IngestError(errors)
+
+    sides = {match.home_team_id, match.away_team_id}
+    for index, item in enumerate(events):
+        if not isinstance(item, dict):
+            error("events", index, "must be an object")
+            continue
+        if item.get("event_type") not in EVENT_TYPES:
+            error("events", index, f"event_type must be one of {', '.join(EVENT_TYPES)}")
+        if not _is_id(item.get("team_id")) or item["team_id"] not in sides:
+            error("events", index, "team_id must be one of the match's teams")
+        if item.get("player_id") is not None and not _is_id(item["player_id"]):
+            error("events", index, "player_id must be a number")
+        if not EVENT_TIME.match(str(item.get("event_time") or "")):
+            error("events", index, "event_time must look like 45 or 90+3")
+
+    # every referenced player in one query
+    player_ids = {item["player_id"] for item in events
+                  if isinstance(item, dict) and _is_id(item.get("player_id"))}
+    known = {player_id for (player_id,) in db.session.query(Player.id).filter(Player.id.in_(player_ids))}
+    for index, item in enumerate(events):
+        if isinstance(item, dict) and _is_id(item.get("player_id")) and item["player_id"] not in known:
+            error("events", index, "player not found")
+
+    for index, item in enumerate(stats):
+        if not isinstance(item, dict):
+            error("stats", index, "must be an object")
+            continue
+        if not _is_id(item.get("team_id")) or item["team_id"] not in sides:
+            error("stats", index, "team_id must be one of the match's teams")
+        for name, value in item.items():
+            if name == "team_id":
+                continue
+            if name == "possession":
+                if not isinstance(value, (int, float)) or isinstance(value, bool) or not 0 <= value <= 100:
+                    error("stats", index, "possession must be between 0 and 100")
+            elif name not in STATS_COUNTERS:
+                error("stats", index, f"unknown stat {name}")
+            elif not isinstance(value, int) or isinstance(value, bool):
+                error("stats", index, f"{name} must be a whole number")
+
+    if errors:
+        raise IngestError(errors)
+
+
+def _apply_stats(match, stats):
+    # sum the batch per team first: one expression per column and row
+    deltas, possession = {}, {}
+    for item in stats:
+        counters = deltas.setdefault(item["team_id"], dict.fromkeys(STATS_COUNTERS, 0))
+        for name, value in item.items():
+            if name == "possession":
+                possession[item["team_id"]] = value
+            elif name != "team_id":
+                counters[name] += value
+
+    rows = {row.team_id: row for row in Stats.query.filter(
+        Stats.match_id == match.id, Stats.team_id.in_(deltas)).with_for_update()}
+    for team_id, counters in deltas.items():
+        row = rows.get(team_id)
+        if row is None:
+            row = rows[team_id] = Stats(match_id=match.id, team_id=team_id, possession=0.0, **counters)
+            db.session.add(row)
+        else:
+            for name, value in counters.items():
+                if value:
+                    # column expression so concurrent batches add up
+                    setattr(row, name, getattr(Stats, name) + value)
+        if team_id in possession:
+            row.possession = possession[team_id]
+    return list(rows.values())
+
+
+def _add_goals(match, home, away):
+    # column expressions so concurrent batches add up, then the row as the
+    # update left it; the returned standings snapshot is that row minus
+    # this batch's goals, not whatever the caller loaded earlier. The scores
+    # are flagged so the flush hooks (live feed, calendar buckets) still see
+    # the change; the flush rewrites the same values under the row the
+    # update already holds
+    db.session.execute(
+        update(Match)
+        .where(Match.id == match.id)
+        .values(home_score=func.coalesce(Match.home_score, 0) + home,
+                away_score=func.coalesce(Match.away_score, 0) + away)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.refresh(match, ["home_score", "away_score", "status"])
+    for name, goals in (("home_score", home), ("away_score", away)):
+        if goals:
+            flag_modified(match, name)
+    return (match.is_finished, match.home_score - home, match.away_score - away)
+
+
+def ingest(match, events, stats):
+    # validate the whole batch, then write events, stats deltas and the
+    # resulting score in one commit; returns the serialized events and the
+    # match's stats rows
+    _validate(match, events, stats)
+
+    before = standings.snapshot(match)
+    rows = [
+        Event(match_id=match.id, team_id=item["team_id"], player_id=item.get("player_id"),
+              event_type=item["event_type"], event_time=str(item["event_time"]))
+        for item in events
+    ]
+    db.session.add_all(rows)
+    stats_rows = _apply_stats(match, stats) if stats else []
+
+    goals = [item["team_id"] for item in events if item["event_type"] == "goal"]
+    if goals:
+        before = _add_goals(match, goals.count(match.home_team_id), goals.count(match.away_team_id))
+
+    # serialized ahead of the commit, which would expire every row
+    db.session.flush()
+    created = [row.to_dict() for row in rows]
+    totals = [row.to_dict() for row in stats_rows]
+
+    save_result(match, before, tables=("events", "stats", "player_tallies"))
+    return created, totals
+
+
+def timeline(match_id):
+    # the match's events in playing order with player and team names, one
+    # query on ix_events_match_minute
+    rows = db.session.query(
+        Event.id, Event.minute, Event.added, Event.event_time, Event.event_type,
+        Event.team_id, Team.name.label("team_name"),
+        Event.player_id, Player.first_name, Player.last_name,
+    ).outerjoin(Team, Team.id == Event.team_id) \
+     .outerjoin(Player, Player.id == Event.player_id) \
+     .filter(Event.match_id == match_id) \
+     .order_by(Event.minute, Event.added, Event.id)
+    return [dict(row._mapping) for row in rows]
@@ -0,0 +1,175 @@
+import logging, os, threading, time as clock
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app_dir import broker, day_buckets
+from app_dir.models import Competition, Match, Team
+
+MATCH_FIELDS = ("id", "home_score", "away_score", "status", "match_date", "match_time")
+
+# broker topic carrying the days whose buckets every worker should drop
+CALENDAR_TOPIC = ("calendar",)
+
+logger = logging.getLogger(__name__)
+_warmer_pid = None  # process the warm-up thread runs in
+_warmer_lock = threading.Lock()
+
+
+def week_of(day):
+    # Monday..Sunday around `day`
+    monday = day - timedelta(days=day.weekday())
+    return [monday + timedelta(days=offset) for offset in range(7)]
+
+
+def _team(team):
+    if team is None:
+        return None
+    return {"id": team.id, "name": team.name, "logo": team.logo}
+
+
+def _load(first_day, last_day):
+    # one range scan on kickoff_at for every day in [first_day, last_day];
+    # days without fixtures come back as empty buckets so they are cached too
+    matches = Match.query_with_related().filter(
+        Match.kickoff_at >= datetime.combine(first_day, time.min),
+        Match.kickoff_at < datetime.combine(last_day + timedelta(days=1), time.min),
+    ).order_by(Match.competition_id, Match.kickoff_at, Match.id)
+
+    groups = {}
+    for match in matches:
+        day = match.kickoff_at.date()
+        group = groups.get((day, match.competition_id))
+        if group is None:
+            competition = match.competition
+            group = groups[(day, match.competition_id)] = {
+                "competition": {
+                    "id": competition.id,
+                    "name": competition.name,
+                    "season": competition.season,
+                    "types": competition.types,
+                } if competition else None,
+                "matches": [],
+            }
+        match_info = {name: getattr(match, name) for name in MATCH_FIELDS}
+        match_info["kickoff_at"] = match.kickoff_at.isoformat()
+        match_info["home_team"] = _team(match.home_team)
+        match_info["away_team"] = _team(match.away_team)
+        group["matches"].append(match_info)
+
+    buckets = {first_day + timedelta(days=offset): []
+               for offset in range((last_day - first_day).days + 1)}
+    for (day, _), group in groups.items():
+        buckets[day].append(group)
+    return buckets
+
+
+def fixtures_by_day(days):
+    # {day: [competition groups]} for the requested days; cached days are
+    # served from memory, and a miss also loads the cold days after it (up
+    # to CALENDAR_WARM_DAYS) so the rest of the week is already warm
+    buckets, missing = day_buckets.get_many(days)
+    if missing:
+        generation = day_buckets.generation
+        first_day, last_day = min(missing), max(missing)
+        _, cold = day_buckets.get_many(
+            [last_day + timedelta(days=offset) for offset in range(1, day_buckets.warm_days)])
+        # read ahead up to the first day that is already warm
+        for day in cold:
+            if day != last_day + timedelta(days=1):
+                break
+            last_day = day
+        loaded = _load(first_day, last_day)
+        day_buckets.fill(loaded, generation)
+        buckets.update((day, loaded[day]) for day in missing)
+    return [{"date": day.isoformat(), "competitions": buckets[day]} for day in days]
+
+
+def warm(today=None):
+    # reload today and the following warm_days - 1 days in one range scan
+    # and replace their buckets, expired or not
+    today = today or datetime.utcnow().date()
+    generation = day_buckets.generation
+    day_buckets.fill(_load(today, today + timedelta(days=day_buckets.warm_days - 1)), generation)
+
+
+def init_app(app):
+    # every worker warms its own buckets: they live in its memory
+    if app.config.get("CALENDAR_WARM_INTERVAL", 0) > 0:
+        app.before_request(lambda: start_warmer(app))
+
+
+def start_warmer(app):
+    # one thread per process, started on its first request so that under a
+    # pre-fork server it runs in each worker rather than the master
+    global _warmer_pid
+    if _warmer_pid == os.getpid():
+        return
+    with _warmer_lock:
+        if _warmer_pid == os.getpid():
+            return
+        _warmer_pid = os.getpid()
+        threading.Thread(target=_keep_warm, args=(app,), name="calendar-warmer", daemon=True).start()
+
+
+def _keep_warm(app):
+    # the interval is shorter than the bucket TTL, so the hot days are
+    # replaced before they expire and a request never pays for the reload
+    interval = min(app.config["CALENDAR_WARM_INTERVAL"], app.config["CALENDAR_CACHE_TTL"] / 2)
+    while True:
+        try:
+            with app.app_context():
+                warm()
+        except Exception:
+            logger.exception("calendar: warm-up failed")
+        clock.sleep(interval)
+
+
+def _kickoff_days(state):
+    # the day a match sat on before this flush and the day it sits on now
+    history = state.attrs.kickoff_at.history
+    return {value.date() for value in (*history.deleted, *history.unchanged, *history.added)
+            if value is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def _touched_days(session, flush_context):
+    touched = session.info.setdefault("matchdays", set())
+    for obj in session.new:
+        if isinstance(obj, Match):
+            touched.update(_kickoff_days(inspect(obj)))
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, Match):
+            touched.update(_kickoff_days(inspect(obj)))
+        elif isinstance(obj, (Team, Competition)):
+            # team and competition names are copied into every bucket
+            touched.add(None)
+
+
+def invalidate_days(days=None):
+    # drop the buckets for `days` (every day when None) in this worker and,
+    # through the broker, in every other one
+    data = {"days": sorted(day.isoformat() for day in days) if days is not None else None}
+    broker.publish([CALENDAR_TOPIC], "days", data)
+
+
+def _drop_days(message):
+    days = message.data["days"]
+    if days is None:
+        day_buckets.clear()
+    else:
+        day_buckets.invalidate(*(date.fromisoformat(day) for day in days))
+
+
+broker.listen(_drop_days, CALENDAR_TOPIC)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_days(session):
+    touched = session.info.pop("matchdays", None)
+    if touched:
+        invalidate_days(None if None in touched else touched)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_days(session, previous_transaction):
+    session.info.pop("matchdays", None)
@@ -1,7 +1,10 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import case, event, false, func
+from sqlalchemy.orm import Session, joinedload, selectinload, with_loader_criteria
 from werkzeug.security import generate_password_hash, check_password_hash
-from app_dir import db
+from app_dir import db, response_cache
+from app_dir.serializers import serializer_for
 
 # =====================================================
 # Base Model
@@ -18,20 +21,24 @@ class BaseModel(db.Model):
     def save(self):
         db.session.add(self)
         db.session.commit()
+        response_cache.invalidate(self.__tablename__)
 
     def soft_delete(self):
         self.is_active = False
         self.is_deleted = True
         db.session.commit()
+        response_cache.invalidate(self.__tablename__)
 
     def restore(self):
         self.is_active = True
         self.is_deleted = False
         db.session.commit()
+        response_cache.invalidate(self.__tablename__)
 
     def delete(self):
         db.session.delete(self)
         db.session.commit()
+        response_cache.invalidate(self.__tablename__)
 
     def update(self, **kwargs):
         for key, value in kwargs.items():
@@ -40,16 +47,7 @@ class BaseModel(db.Model):
         self.save()
 
     def to_dict(self, exclude=None):
-        exclude = exclude or []
-        data = {}
-        for column in self.__table__.columns:
-            if column.name in exclude:
-                continue
-            value = getattr(self, column.name)
-            if isinstance(value, datetime):
-                value = value.isoformat()
-            data[column.name] = value
-        return data
+        return serializer_for(type(self), exclude)(self)
     
     @classmethod
     def get_user_by_email(cls, email):
@@ -63,8 +61,12 @@ class BaseModel(db.Model):
     
     @classmethod
     def get_teams(cls):
-        teams = [team for team in cls.query.all() if not team.is_deleted]
-        return teams
+        return cls.query.all()
+
+    @classmethod
+    def with_deleted(cls):
+        # admin views: skip the soft-delete filter for this query
+        return cls.query.execution_options(include_deleted=True)
     
     @classmethod
     def get_team(cls, id):
@@ -72,6 +74,34 @@ class BaseModel(db.Model):
         return team if team else None
 
 
+@event.listens_for(Session, "do_orm_execute")
+def _hide_soft_deleted(execute_state):
+    # every ORM SELECT gets "is_deleted = false" in SQL; relationship loads
+    # inherit the criteria from the query that loaded their parent
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                BaseModel,
+                lambda cls: cls.is_deleted == false(),
+                include_aliases=True,
+            )
+        )
+
+
+def live_rows_index(name, *columns):
+    # partial index over the rows the soft-delete filter lets through
+    return db.Index(
+        name, *columns,
+        sqlite_where=db.text("is_deleted = 0"),
+        postgresql_where=db.text("is_deleted = false"),
+    )
+
+
 # =====================================================
 # User
 # =====================================================
@@ -103,10 +133,15 @@ class User(BaseModel):
 # =====================================================
 class Competition(BaseModel):
     __tablename__ = "competitions"
+    __table_args__ = (
+        live_rows_index("ix_competitions_live", "id"),
+        db.Index("ix_competitions_updated", "updated_at", "id"),
+    )
 
     name = db.Column(db.String(120), nullable=False)
     season = db.Column(db.String(20))
     types = db.Column(db.String(50))  # league, knockout
+    standings_version = db.Column(db.Integer, default=0, server_default="0", nullable=False)
 
     matches = db.relationship("Match", back_populates="competition")
     standings = db.relationship("Standing", back_populates="competition")
@@ -117,6 +152,9 @@ class Competition(BaseModel):
 # =====================================================
 class County(BaseModel):
     __tablename__ = "counties"
+    __table_args__ = (
+        db.Index("ix_counties_updated", "updated_at", "id"),
+    )
 
     name = db.Column(db.String(50), unique=True, nullable=False)
     # flag = db.Column(db.String(50), default=None)
@@ -128,10 +166,14 @@ class County(BaseModel):
 # =====================================================
 class Team(BaseModel):
     __tablename__ = "teams"
+    __table_args__ = (
+        live_rows_index("ix_teams_live", "id"),
+        db.Index("ix_teams_updated", "updated_at", "id"),
+    )
 
     name = db.Column(db.String(120), nullable=False)
     logo = db.Column(db.String(255))
-    county_id = db.Column(db.Integer, db.ForeignKey("counties.id"), default=None)
+    county_id = db.Column(db.Integer, db.ForeignKey("counties.id"), default=None, index=True)
 
     county = db.relationship("County", back_populates="teams")
     home_matches = db.relationship(
@@ -149,12 +191,25 @@ class Team(BaseModel):
     lineups = db.relationship("MatchLineup", back_populates="team")
     standings = db.relationship("Standing", back_populates="team")
 
+    @classmethod
+    def get_profile(cls, id):
+        # squad + players and both fixture lists (with competition and
+        # opponents) in a fixed number of queries, whatever the team size
+        return cls.query.options(
+            selectinload(cls.squad).joinedload(TeamSquad.player),
+            selectinload(cls.home_matches).options(*Match.related_options()),
+            selectinload(cls.away_matches).options(*Match.related_options()),
+        ).filter_by(id=id).first()
+
 
 # =====================================================
 # Player
 # =====================================================
 class Player(BaseModel):
     __tablename__ = "players"
+    __table_args__ = (
+        db.Index("ix_players_updated", "updated_at", "id"),
+    )
 
     first_name = db.Column(db.String(80), nullable=False)
     last_name = db.Column(db.String(80), nullable=False)
@@ -171,9 +226,12 @@ class Player(BaseModel):
 # =====================================================
 class TeamSquad(BaseModel):
     __tablename__ = "team_squads"
+    __table_args__ = (
+        db.Index("ix_team_squads_team_season", "team_id", "season"),
+    )
 
     team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), nullable=False)
-    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False, index=True)
     squad_number = db.Column(db.Integer)
     season = db.Column(db.String(20))
 
@@ -184,12 +242,21 @@ class TeamSquad(BaseModel):
 # =====================================================
 # Match
 # =====================================================
+KICKOFF_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y")
+KICKOFF_TIME_FORMATS = ("%H:%M", "%H:%M:%S")
+
 class Match(BaseModel):
     __tablename__ = "matches"
+    __table_args__ = (
+        db.Index("ix_matches_competition_kickoff", "competition_id", "kickoff_at"),
+        live_rows_index("ix_matches_live_kickoff", "kickoff_at", "id"),
+        db.Index("ix_matches_team_pair", "pair_low_id", "pair_high_id", "kickoff_at"),
+        db.Index("ix_matches_updated", "updated_at", "id"),
+    )
 
     competition_id = db.Column(db.Integer, db.ForeignKey("competitions.id"))
-    home_team_id = db.Column(db.Integer, db.ForeignKey("teams.id"))
-    away_team_id = db.Column(db.Integer, db.ForeignKey("teams.id"))
+    home_team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), index=True)
+    away_team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), index=True)
 
     home_score = db.Column(db.Integer, default=0)
     away_score = db.Column(db.Integer, default=0)
@@ -198,6 +265,11 @@ class Match(BaseModel):
     status = db.Column(db.String(20), default="scheduled")  # scheduled, live, FT
     match_date = db.Column(db.String(20), nullable=False)
     match_time = db.Column(db.String(20), nullable=False)
+    # UTC kick-off derived from match_date/match_time; what queries sort and filter on
+    kickoff_at = db.Column(db.DateTime, nullable=False)
+    # unordered (min, max) team pair, so head-to-head is one index range
+    pair_low_id = db.Column(db.Integer)
+    pair_high_id = db.Column(db.Integer)
 
     competition = db.relationship("Competition", back_populates="matches")
     home_team = db.relationship(
@@ -214,14 +286,119 @@ class Match(BaseModel):
     lineups = db.relationship("MatchLineup", back_populates="match")
     media = db.relationship("Media", back_populates="match")
 
+    @staticmethod
+    def parse_kickoff(match_date, match_time):
+        # "2026-01-03" + "15:00" -> datetime(2026, 1, 3, 15, 0), read as UTC
+        if not match_date or not match_time:
+            return None
+        for date_format in KICKOFF_DATE_FORMATS:
+            for time_format in KICKOFF_TIME_FORMATS:
+                try:
+                    return datetime.strptime(f"{match_date.strip()} {match_time.strip()}",
+                                             f"{date_format} {time_format}")
+                except ValueError:
+                    continue
+        return None
+
+    @staticmethod
+    def team_pair(team_id, other_team_id):
+        if team_id is None or other_team_id is None:
+            return None, None
+        return min(team_id, other_team_id), max(team_id, other_team_id)
+
+    @classmethod
+    def pair_filter(cls, team_id, other_team_id):
+        low, high = cls.team_pair(team_id, other_team_id)
+        return cls.pair_low_id == low, cls.pair_high_id == high
+
+    @classmethod
+    def head_to_head(cls, team_id, opponent_id):
+        # W/D/L and goals from team_id's side over their finished meetings
+        is_home = cls.home_team_id == team_id
+        scored = case((is_home, cls.home_score), else_=cls.away_score)
+        conceded = case((is_home, cls.away_score), else_=cls.home_score)
+        played, won, drawn, lost, goals_for, goals_against = db.session.query(
+            func.count(cls.id),
+            func.coalesce(func.sum(case((scored > conceded, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((scored == conceded, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((scored < conceded, 1), else_=0)), 0),
+            func.coalesce(func.sum(scored), 0),
+            func.coalesce(func.sum(conceded), 0),
+        ).filter(*cls.pair_filter(team_id, opponent_id), func.lower(cls.status) == "ft").one()
+        return {"played": played, "won": won, "drawn": drawn, "lost": lost,
+                "goals_for": goals_for, "goals_against": goals_against}
+
+    @property
+    def is_finished(self):
+        return (self.status or "").lower() == "ft"
+
+    @property
+    def is_live(self):
+        return (self.status or "").lower() == "live"
+
+    @classmethod
+    def related_options(cls):
+        return (
+            joinedload(cls.competition),
+            joinedload(cls.home_team),
+            joinedload(cls.away_team),
+        )
+
+    @classmethod
+    def query_with_related(cls):
+        # one SELECT with competition and both teams joined in
+        return cls.query.options(*cls.related_options())
+
+    @classmethod
+    def group_by_competition(cls, competition_ids, upcoming=None, options=()):
+        # one IN query bucketed by competition; with upcoming=N only the
+        # next N scheduled fixtures of each competition are returned
+        query = cls.query.options(*options).filter(cls.competition_id.in_(competition_ids))
+        if upcoming:
+            ranked = db.session.query(
+                cls.id,
+                func.row_number().over(
+                    partition_by=cls.competition_id,
+                    order_by=(cls.kickoff_at, cls.id),
+                ).label("position"),
+            ).filter(
+                cls.competition_id.in_(competition_ids),
+                func.lower(cls.status) == "scheduled",
+            ).subquery()
+            query = query.join(ranked, ranked.c.id == cls.id).filter(ranked.c.position <= upcoming)
+
+        grouped = {competition_id: [] for competition_id in competition_ids}
+        for match in query.order_by(cls.competition_id, cls.kickoff_at, cls.id):
+            grouped[match.competition_id].append(match)
+        return grouped
+
+    @classmethod
+    def count_by_competition(cls, competition_ids):
+        rows = db.session.query(cls.competition_id, func.count(cls.id)).filter(
+            cls.competition_id.in_(competition_ids)
+        ).group_by(cls.competition_id)
+        counts = {competition_id: 0 for competition_id in competition_ids}
+        counts.update(rows)
+        return counts
+
     def update(self, **kwargs):
         for key, value in kwargs.items():
             if hasattr(self, key):
                 setattr(self, key, value)
-        db.session.commit(self)
+        db.session.commit()
+        response_cache.invalidate(self.__tablename__)
         return self
 
 
+@event.listens_for(Match, "before_insert")
+@event.listens_for(Match, "before_update")
+def _set_derived_columns(mapper, connection, match):
+    match.pair_low_id, match.pair_high_id = Match.team_pair(match.home_team_id, match.away_team_id)
+    kickoff_at = Match.parse_kickoff(match.match_date, match.match_time)
+    if kickoff_at is not None:
+        match.kickoff_at = kickoff_at
+
+
 
 # =====================================================
 # Match Lineup
@@ -229,9 +406,9 @@ class Match(BaseModel):
 class MatchLineup(BaseModel):
     __tablename__ = "match_lineups"
 
-    match_id = db.Column(db.Integer, db.ForeignKey("matches.id"), nullable=False)
-    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), nullable=False)
-    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False)
+    match_id = db.Column(db.Integer, db.ForeignKey("matches.id"), nullable=False, index=True)
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), nullable=False, index=True)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False, index=True)
     is_starting = db.Column(db.Boolean, default=False)
     position = db.Column(db.String(20))
 
@@ -245,9 +422,13 @@ class MatchLineup(BaseModel):
 # =====================================================
 class Standing(BaseModel):
     __tablename__ = "standings"
+    __table_args__ = (
+        db.Index("ix_standings_competition_team", "competition_id", "team_id", unique=True),
+        db.Index("ix_standings_updated", "updated_at", "id"),
+    )
 
     competition_id = db.Column(db.Integer, db.ForeignKey("competitions.id"))
-    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"))
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), index=True)
 
     played = db.Column(db.Integer, default=0)
     won = db.Column(db.Integer, default=0)
@@ -260,6 +441,17 @@ class Standing(BaseModel):
     competition = db.relationship("Competition", back_populates="standings")
     team = db.relationship("Team", back_populates="standings")
 
+    @classmethod
+    def get_or_create(cls, competition_id, team_id):
+        standing = cls.with_deleted().filter_by(competition_id=competition_id, team_id=team_id).first()
+        if standing is None:
+            standing = cls(competition_id=competition_id, team_id=team_id,
+                           played=0, won=0, drawn=0, lost=0,
+                           goals_for=0, goals_against=0, points=0)
+            db.session.add(standing)
+            db.session.flush()
+        return standing
+
 
 # =====================================================
 # News
@@ -270,8 +462,8 @@ class News(BaseModel):
     title = db.Column(db.String(255), nullable=False)
     content = db.Column(db.Text)
     source = db.Column(db.String(120))
-    competition_id = db.Column(db.Integer, db.ForeignKey("competitions.id"))
-    author_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    competition_id = db.Column(db.Integer, db.ForeignKey("competitions.id"), index=True)
+    author_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
 
     competition = db.relationship("Competition", back_populates="news")
     author = db.relationship("User", back_populates="news")
@@ -285,8 +477,8 @@ class Media(BaseModel):
 
     file_path = db.Column(db.String(255), nullable=False)
     file_type = db.Column(db.String(20))  # image, video, pdf
-    match_id = db.Column(db.Integer, db.ForeignKey("matches.id"))
-    uploaded_by = db.Column(db.Integer, db.ForeignKey("users.id"))
+    match_id = db.Column(db.Integer, db.ForeignKey("matches.id"), index=True)
+    uploaded_by = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
 
     match = db.relationship("Match", back_populates="media")
     uploader = db.relationship("User", back_populates="media")
@@ -299,9 +491,12 @@ class AdminLog(BaseModel):
 
 class Stats(BaseModel):
     __tablename__ = "stats"
+    __table_args__ = (
+        db.Index("ix_stats_match_team", "match_id", "team_id"),
+    )
 
     match_id = db.Column(db.Integer, db.ForeignKey("matches.id"))
-    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"))
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), index=True)
     possession = db.Column(db.Float, default=0.0)
     shots_on_target = db.Column(db.Integer, default=0)
     shots_off_target = db.Column(db.Integer, default=0)
@@ -315,18 +510,100 @@ class Stats(BaseModel):
     match = db.relationship("Match")
     team = db.relationship("Team")
 
+EVENT_TYPES = ("goal", "assist", "yellow_card", "red_card", "substitution")
+
 class Event(BaseModel):
     __tablename__ = "events"
+    __table_args__ = (
+        db.Index("ix_events_match_minute", "match_id", "minute", "added"),
+    )
 
     match_id = db.Column(db.Integer, db.ForeignKey("matches.id"))
-    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"))
-    player_id = db.Column(db.Integer, db.ForeignKey("players.id"))
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), index=True)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), index=True)
     event_type = db.Column(db.String(50))  # goal, assist, yellow_card, red_card, substitution
     event_time = db.Column(db.String(10))  # e.g., "45+2", "90"
+    # event_time as numbers ("45+2" -> 45, 2), what timelines sort on
+    minute = db.Column(db.Integer, nullable=False, default=0)
+    added = db.Column(db.Integer, nullable=False, default=0)
 
     match = db.relationship("Match")
     team = db.relationship("Team")
     player = db.relationship("Player")
 
+    @staticmethod
+    def parse_event_time(event_time):
+        # "45+2" -> (45, 2), "90" -> (90, 0); anything else -> (0, 0)
+        minute, _, added = str(event_time or "").strip().partition("+")
+        if not minute.isdecimal() or (added and not added.isdecimal()):
+            return 0, 0
+        return int(minute), int(added or 0)
+
+
+@event.listens_for(Event, "before_insert")
+@event.listens_for(Event, "before_update")
+def _set_event_minute(mapper, connection, obj):
+    obj.minute, obj.added = Event.parse_event_time(obj.event_time)
+
+
+# =====================================================
+# Player Tally (per competition leaderboard counters)
+# =====================================================
+class PlayerTally(BaseModel):
+    __tablename__ = "player_tallies"
+    __table_args__ = (
+        db.Index("ix_player_tallies_competition_player", "competition_id", "player_id", unique=True),
+        db.Index("ix_player_tallies_competition_goals", "competition_id", "goals", "player_id"),
+        db.Index("ix_player_tallies_competition_assists", "competition_id", "assists", "player_id"),
+        db.Index("ix_player_tallies_competition_yellow_cards", "competition_id", "yellow_cards", "player_id"),
+        db.Index("ix_player_tallies_competition_red_cards", "competition_id", "red_cards", "player_id"),
+    )
+
+    competition_id = db.Column(db.Integer, db.ForeignKey("competitions.id"), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey("players.id"), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"))
+    goals = db.Column(db.Integer, default=0, nullable=False)
+    assists = db.Column(db.Integer, default=0, nullable=False)
+    yellow_cards = db.Column(db.Integer, default=0, nullable=False)
+    red_cards = db.Column(db.Integer, default=0, nullable=False)
+    substitutions = db.Column(db.Integer, default=0, nullable=False)
 
-    
\ No newline at end of file
+    competition = db.relationship("Competition")
+    player = db.relationship("Player")
+    team = db.relationship("Team")
+
+
+# =====================================================
+# Bracket (knockout tree, one row per competition)
+# =====================================================
+class Bracket(BaseModel):
+    __tablename__ = "brackets"
+
+    competition_id = db.Column(db.Integer, db.ForeignKey("competitions.id"), nullable=False, unique=True)
+    # {"rounds": [[tie, ...], ...], "matches": {match_id: [round, slot]}}
+    tree = db.Column(db.JSON, nullable=False)
+
+    competition = db.relationship("Competition")
+
+
+# =====================================================
+# Team form (rolling window of recent results)
+# =====================================================
+class TeamForm(BaseModel):
+    __tablename__ = "team_forms"
+
+    team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), nullable=False, unique=True)
+    # newest first, at most form.FORM_LENGTH entries:
+    # [{"match_id", "kickoff_at", "opponent_id", "venue", "goals_for", "goals_against", "result"}]
+    recent = db.Column(db.JSON, nullable=False)
+
+    team = db.relationship("Team")
+
+    @classmethod
+    def get_or_create(cls, team_id):
+        form = cls.with_deleted().filter_by(team_id=team_id).with_for_update().first()
+        if form is None:
+            form = cls(team_id=team_id, recent=[])
+            db.session.add(form)
+            db.session.flush()
+        return form
@@ -0,0 +1,68 @@
+import base64, binascii, json
+from datetime import datetime
+from sqlalchemy import DateTime, and_, or_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+
+class CursorError(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor, columns):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except (binascii.Error, TypeError, ValueError):
+        raise CursorError("invalid cursor")
+
+
+def page_args(args):
+    # reads ?cursor=&limit= from the request args
+    cursor = args.get("cursor") or None
+    limit = args.get("limit", DEFAULT_LIMIT)
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        raise CursorError("limit must be a number")
+
+    if limit < 1:
+        raise CursorError("limit must be a positive number")
+    return cursor, min(limit, MAX_LIMIT)
+
+
+def _after(columns, values):
+    # (a, b, c) > (x, y, z) spelled out so it works without row values
+    clauses = []
+    for i, column in enumerate(columns):
+        equal = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, column > values[i]))
+    return or_(*clauses)
+
+
+def keyset_page(query, columns, cursor=None, limit=DEFAULT_LIMIT):
+    # no OFFSET: the cursor carries the sort key of the last row served,
+    # so every page is an index range scan of `limit` rows
+    if cursor:
+        query = query.filter(_after(columns, decode_cursor(cursor, columns)))
+
+    rows = query.order_by(*columns).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(getattr(rows[-1], column.key) for column in columns)
+    return rows, next_cursor
@@ -0,0 +1,60 @@
+from sqlalchemy import inspect, update
+from app_dir import brackets, db, form, response_cache, standings
+from app_dir.models import Match
+
+# what a score write is checked against before anything derived from it
+CLAIMED_FIELDS = ("home_score", "away_score", "status")
+
+
+class ResultConflict(ValueError):
+    pass
+
+
+def claim_result(match):
+    # compare-and-swap on the score columns: write the new values only if
+    # the row still holds the ones this request read. The UPDATE takes the
+    # write lock (a row lock, or SQLite's database lock), so a concurrent
+    # correction of the same match waits here and then misses, before
+    # either one has applied a standings or form delta
+    state = inspect(match)
+    read = {}
+    for name in CLAIMED_FIELDS:
+        history = state.attrs[name].history
+        read[name] = history.deleted[0] if history.deleted else getattr(match, name)
+
+    # no autoflush: flushing the pending edit first would make the row
+    # look changed by someone else
+    with db.session.no_autoflush:
+        claimed = db.session.execute(
+            update(Match)
+            .where(Match.id == match.id,
+                   *(getattr(Match, name).is_not_distinct_from(value) for name, value in read.items()))
+            .values({name: getattr(match, name) for name in CLAIMED_FIELDS})
+            .execution_options(synchronize_session=False)
+        )
+    if claimed.rowcount != 1:
+        raise ResultConflict("match was changed by another request, reload it and retry")
+
+
+def save_result(match, before, tables=(), penalties=None):
+    # commit a score write together with everything derived from it:
+    # standings, both teams' form and the knockout bracket. `before` is a
+    # standings.snapshot taken ahead of the write; `tables` are extra
+    # response-cache tags the caller's own rows touched; `penalties` is a
+    # (home, away) shoot-out for a knockout tie level at FT. Raises
+    # brackets.BracketError (nothing committed) for an FT knockout draw
+    # without one
+    table_changed = standings.apply_result_change(match, before)
+    form_changed = form.apply_result_change(match, before)
+    bracket_changed = brackets.record_result(match, penalties)
+    match.save()
+
+    changed = list(tables)
+    if table_changed:
+        changed += ["standings", "competitions"]
+    if form_changed:
+        changed.append("team_forms")
+    if bracket_changed:
+        changed.append("brackets")
+    if changed:
+        response_cache.invalidate(*changed)
@@ -1,5 +1,8 @@
 from app_dir.routes.auths import auths_bp
 from app_dir.routes.user_bp import users_bp
+from app_dir.routes.sync_bp import sync_bp
 from app_dir.routes.leagues_teams.teams_bp import teams_bp
+from app_dir.routes.leagues_teams.competitions_bp import competitions_bp
+from app_dir.routes.leagues_teams.matches_bp import matches_bp
 
-all_bps = [auths_bp, users_bp, teams_bp]
\ No newline at end of file
+all_bps = [auths_bp, users_bp, teams_bp, competitions_bp, matches_bp, sync_bp]
\ No newline at end of file
@@ -0,0 +1,145 @@
+from flask import request, Blueprint
+from app_dir.models import Bracket, Competition, User
+from app_dir import brackets, fixtures, json_err, json_ok, leaderboards, response_cache, standings
+from flask_jwt_extended import get_jwt_identity, jwt_required
+
+competitions_bp = Blueprint("competitions", __name__, url_prefix="/competitions")
+
+# REBUILD A COMPETITION'S STANDINGS
+@competitions_bp.route("/rebuild_standings", methods=['POST'])
+@jwt_required()
+def rebuild_standings():
+    try:
+        admin_id = int(get_jwt_identity())
+        competition_id = request.json.get("competition_id")
+    except Exception as e:
+        return json_err({"error": str(e)})
+
+    admin = User.get_user(admin_id)
+    if not admin:
+        return json_err({"error": "Admin not found"}, 404)
+
+    competition = Competition.query.filter_by(id=competition_id).first()
+    if not competition:
+        return json_err({"error": "Competition not found"}, 404)
+
+    teams = standings.rebuild(competition.id)
+    return json_ok({"competition_id": competition.id, "teams": teams})
+
+# LEAGUE TABLE
+@competitions_bp.route("/standings", methods=['GET'])
+def get_standings():
+    competition_id = request.args.get("competition_id", type=int)
+
+    competition = Competition.query.filter_by(id=competition_id).first()
+    if not competition:
+        return json_err({"error": "Competition not found"}, 404)
+
+    # the version moves with every standings write and with any edit to
+    # the competition or its teams, so a cached table or a client ETag is
+    # valid until one of those lands
+    version = standings.table_version(competition)
+    response = response_cache.remember(
+        ("standings", competition.id, version),
+        ("standings", "teams", "competitions"),
+        lambda: json_ok({"competition": competition.to_dict(),
+                         "standings": standings.table(competition.id)}),
+    )
+    response.set_etag(f"standings-{competition.id}-{version}")
+    return response.make_conditional(request)
+
+# PLAYER LEADERBOARDS (top scorers, assists, discipline)
+@competitions_bp.route("/leaderboard", methods=['GET'])
+@response_cache.cached("events", "player_tallies", "players", "teams")
+def get_leaderboard():
+    competition_id = request.args.get("competition_id", type=int)
+    stat = request.args.get("stat", "goals")
+    limit = request.args.get("limit", 10, type=int)
+
+    if stat not in leaderboards.LEADERBOARD_STATS:
+        return json_err({"error": f"stat must be one of {', '.join(leaderboards.LEADERBOARD_STATS)}"})
+
+    if not 1 <= limit <= 100:
+        return json_err({"error": "limit must be between 1 and 100"})
+
+    competition = Competition.query.filter_by(id=competition_id).first()
+    if not competition:
+        return json_err({"error": "Competition not found"}, 404)
+
+    return json_ok({"competition_id": competition.id,
+                    "stat": stat,
+                    "leaderboard": leaderboards.leaderboard(competition.id, stat, limit)})
+
+# GENERATE A LEAGUE SCHEDULE
+@competitions_bp.route("/generate_fixtures", methods=['POST'])
+@jwt_required()
+def generate_fixtures():
+    try:
+        admin_id = int(get_jwt_identity())
+        competition_id = request.json.get("competition_id")
+        team_ids = request.json.get("team_ids") or []
+        start_date = request.json.get("start_date")
+        days_between = int(request.json.get("days_between", 7))
+        match_time = request.json.get("match_time", "15:00")
+        double_round = bool(request.json.get("double_round", True))
+    except Exception as e:
+        return json_err({"error": str(e)})
+
+    admin = User.get_user(admin_id)
+    if not admin:
+        return json_err({"error": "Admin not found"}, 404)
+
+    competition = Competition.query.filter_by(id=competition_id).first()
+    if not competition:
+        return json_err({"error": "Competition not found"}, 404)
+
+    try:
+        rows = fixtures.generate_league_fixtures(competition, team_ids, start_date, days_between,
+                                                 match_time, double_round)
+    except fixtures.FixtureError as e:
+        return json_err({"error": str(e)})
+
+    return json_ok({"competition_id": competition.id, "fixtures": len(rows)})
+
+# GENERATE A KNOCKOUT BRACKET
+@competitions_bp.route("/generate_bracket", methods=['POST'])
+@jwt_required()
+def generate_bracket():
+    try:
+        admin_id = int(get_jwt_identity())
+        competition_id = request.json.get("competition_id")
+        team_ids = request.json.get("team_ids") or []
+        start_date = request.json.get("start_date")
+        days_between = int(request.json.get("days_between", 7))
+        match_time = request.json.get("match_time", "15:00")
+    except Exception as e:
+        return json_err({"error": str(e)})
+
+    admin = User.get_user(admin_id)
+    if not admin:
+        return json_err({"error": "Admin not found"}, 404)
+
+    competition = Competition.query.filter_by(id=competition_id).first()
+    if not competition:
+        return json_err({"error": "Competition not found"}, 404)
+
+    try:
+        bracket = brackets.generate_bracket(competition, team_ids, start_date, days_between, match_time)
+    except brackets.BracketError as e:
+        return json_err({"error": str(e)})
+
+    return json_ok({"bracket": bracket.to_dict()})
+
+# GET A KNOCKOUT BRACKET
+@competitions_bp.route("/bracket", methods=['GET'])
+@response_cache.cached("brackets", "teams")
+def get_bracket():
+    competition_id = request.args.get("competition_id", type=int)
+
+    bracket = Bracket.query.filter_by(competition_id=competition_id).first()
+    if not bracket:
+        return json_err({"error": "Bracket not found"}, 404)
+
+    bracket_info = bracket.to_dict()
+    bracket_info["tree"] = brackets.with_team_names(bracket.tree)
+    return json_ok({"bracket": bracket_info})
@@ -0,0 +1,116 @@
+from flask import request, Blueprint, Response
+from app_dir.models import Competition, Match, User
+from app_dir import brackets, db, json_err, json_ok, live, live_feed, match_events, matchdays, response_cache
+from app_dir.scoreboard import scoreboard
+from flask_jwt_extended import get_jwt_identity, jwt_required
+import datetime
+
+matches_bp = Blueprint("matches", __name__, url_prefix="/matches")
+
+# FIXTURES CALENDAR (a day or a week, grouped by competition)
+@matches_bp.route("/calendar", methods=['GET'])
+def get_calendar():
+    span = request.args.get("span", "day")
+    raw_date = request.args.get("date")
+    try:
+        day = datetime.date.fromisoformat(raw_date) if raw_date else datetime.datetime.utcnow().date()
+    except ValueError:
+        return json_err({"error": "date must be YYYY-MM-DD"})
+
+    if span == "day":
+        days = [day]
+    elif span == "week":
+        days = matchdays.week_of(day)
+    else:
+        return json_err({"error": "span must be day or week"})
+
+    return json_ok({"span": span, "days": matchdays.fixtures_by_day(days)})
+
+# LIVE SCORE STREAM (Server-Sent Events, per match or per competition)
+@matches_bp.route("/live", methods=['GET'])
+def live_scores():
+    match_id = request.args.get("match_id", type=int)
+    competition_id = request.args.get("competition_id", type=int)
+    raw_last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_id = int(raw_last_id) if raw_last_id else None
+    except ValueError:
+        return json_err({"error": "Last-Event-ID must be a number"})
+
+    # taken before the snapshot read, so nothing published in between is lost
+    resume_from = live_feed.last_id if last_id is None else last_id
+    first = None
+    if match_id:
+        match = Match.query.filter_by(id=match_id).first()
+        if not match:
+            return json_err({"error": "Match not found"}, 404)
+        channel = ("match", match.id)
+        if last_id is None:
+            # a fresh client gets the current state before any deltas
+            first = live.format_event({"match_id": match.id, "competition_id": match.competition_id,
+                                       **live.match_state(match)}, "snapshot")
+    elif competition_id:
+        if not Competition.query.filter_by(id=competition_id).first():
+            return json_err({"error": "Competition not found"}, 404)
+        channel = ("competition", competition_id)
+    else:
+        return json_err({"error": "match_id or competition_id is required"})
+
+    return Response(
+        live_feed.stream(channel, resume_from, first),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# LIVE SCOREBOARD (served from memory)
+@matches_bp.route("/scoreboard", methods=['GET'])
+def get_scoreboard():
+    competition_id = request.args.get("competition_id", type=int)
+    return json_ok({"matches": scoreboard.matches(competition_id)})
+
+# RECORD A BATCH OF MATCH EVENTS (and stats deltas) IN ONE COMMIT
+@matches_bp.route("/events", methods=['POST'])
+@jwt_required()
+def ingest_events():
+    try:
+        admin_id = int(get_jwt_identity())
+        match_id = request.json.get("match_id")
+        events = request.json.get("events") or []
+        stats = request.json.get("stats") or []
+    except Exception as e:
+        return json_err({"error": str(e)})
+
+    admin = User.get_user(admin_id)
+    if not admin:
+        return json_err({"error": "Admin not found"}, 404)
+
+    # goals are added with column expressions in match_events.ingest, so
+    # concurrent batches add up; the row lock (a no-op on SQLite) only holds
+    # off other writers on backends that support it
+    match = Match.query.filter_by(id=match_id).with_for_update().first()
+    if not match:
+        return json_err({"error": "Match not found"}, 404)
+
+    try:
+        created, totals = match_events.ingest(match, events, stats)
+    except match_events.IngestError as e:
+        db.session.rollback()
+        return json_err({"error": str(e), "errors": e.errors})
+    except brackets.BracketError as e:
+        # goals that leave a finished knockout tie level
+        db.session.rollback()
+        return json_err({"error": str(e)})
+
+    return json_ok({"match": match.to_dict(), "events": created, "stats": totals})
+
+# MATCH TIMELINE (events in playing order)
+@matches_bp.route("/timeline", methods=['GET'])
+@response_cache.cached("events", "players", "teams", "matches")
+def get_timeline():
+    match_id = request.args.get("match_id", type=int)
+
+    match = Match.query.filter_by(id=match_id).first()
+    if not match:
+        return json_err({"error": "Match not found"}, 404)
+
+    return json_ok({"match": match.to_dict(), "timeline": match_events.timeline(match.id)})
@@ -1,12 +1,36 @@
 from flask import jsonify, request, Blueprint, current_app
 from app_dir.models import *
-from app_dir import UPLOAD_FOLDER, allowed_file, json_err, json_ok, db
+from app_dir import UPLOAD_FOLDER, allowed_file, json_err, json_ok, db, response_cache
+from app_dir import brackets, form, results, standings
+from app_dir.pagination import CursorError, keyset_page, page_args
+from app_dir.serializers import FieldsError, load_only_fields, parse_fields, serializer_for
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager, joinedload
 import datetime, os, json
 from werkzeug.utils import secure_filename
 from flask_jwt_extended import get_current_user, create_access_token, create_refresh_token, get_jwt_identity, jwt_required
 
 teams_bp = Blueprint("teams", __name__, url_prefix="/teams")
 
+
+def parse_kickoff_bound(value, end=False):
+    # "2026-01-03" covers the whole day; full ISO datetimes are read as
+    # UTC, and one with an offset is converted to the naive UTC that
+    # kickoff_at is stored in
+    if not value:
+        return None
+    try:
+        if len(value) == 10:
+            day = datetime.datetime.strptime(value, "%Y-%m-%d")
+            return day + datetime.timedelta(days=1) if end else day
+        moment = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"invalid date: {value}")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return moment
+
+
 # REGISTER A TEAM
 @teams_bp.route("/register_team", methods=['POST'])
 def register_team():
@@ -53,40 +77,58 @@ def register_team():
 
 # GET TEAMS DATA
 @teams_bp.route("/get_all_teams", methods=['GET'])
+@response_cache.cached("teams", "team_forms")
 def get_teams():
-    teams = Team.query.all()
-    return json_ok({"teams":[team.to_dict() for team in teams]})
+    try:
+        fields = parse_fields(Team, request.args.get("fields"), relations=("form",))
+        cursor, limit = page_args(request.args)
+        query = Team.query
+        if fields:
+            query = query.options(load_only_fields(Team, fields))
+        teams, next_cursor = keyset_page(query, (Team.id,), cursor, limit)
+    except (CursorError, FieldsError) as e:
+        return json_err({"error":str(e)})
+
+    serialize = serializer_for(Team, only=fields)
+    all_teams = [serialize(team) for team in teams]
+    if fields is None or "form" in fields:
+        # last results for the whole page in one extra query
+        forms = form.form_by_team([team.id for team in teams])
+        for team, team_info in zip(teams, all_teams):
+            team_info["form"] = forms[team.id]
+    return json_ok({"teams":all_teams, "next_cursor":next_cursor})
 
 # GET A TEAM DATA
 @teams_bp.route("/get_team", methods=['POST'])
 def get_team():
     team_id = request.json.get("team_id")
 
-    team = Team.query.filter_by(id=team_id).first()
-    matches = [*team.home_matches, *team.away_matches]
-    team_squad = [player_id.to_dict() for player_id in team.squad]
-    
+    team = Team.get_profile(team_id)
+    if not team:
+        return json_err({"error":"Team Not Found"}, 404)
 
-    
+    matches = [*team.home_matches, *team.away_matches]
     team_info = team.to_dict()
     all_matches = []
 
-
-    for player in team_squad:
-        player["player_data"] = Player.query.filter_by(id=player.get("id")).first().to_dict()
+    team_squad = []
+    for entry in team.squad:
+        if entry.player is None:
+            # the player was soft-deleted; the squad row is left dangling
+            continue
+        player = entry.to_dict()
+        player["player_data"] = entry.player.to_dict()
+        team_squad.append(player)
 
     team_info['squad'] = team_squad
 
     for game in matches:
         _game = game.to_dict()
-        _game["competition_id"] = Competition.query.filter_by(id=_game.get("competition_id")).first().to_dict()
-
-        _game["home_team_id"] = Team.query.filter_by(id=_game.get("home_team_id")).first().to_dict()
-
-        _game["away_team_id"] = Team.query.filter_by(id=_game.get("away_team_id")).first().to_dict()
-
+        _game["competition_id"] = game.competition.to_dict() if game.competition else None
+        _game["home_team_id"] = game.home_team.to_dict() if game.home_team else None
+        _game["away_team_id"] = game.away_team.to_dict() if game.away_team else None
         all_matches.append(_game)
-    
+
     return json_ok({"team":team_info, "team_data":all_matches})
 
 # REGISTER A PLAYER
@@ -160,6 +202,7 @@ def add_to_squard():
 
 # GET TEAM SQUARD AND TEAM INFORMATIONS
 @teams_bp.route("/get_team_squard", methods=['POST'])
+@response_cache.cached("teams", "team_squads", "players", "matches", "match_lineups", "standings")
 def get_team_squard():
     team_id = request.json.get("team_id")
 
@@ -170,12 +213,14 @@ def get_team_squard():
     squard = [{"player_data":player.player.to_dict(),
                "player_number":player.squad_number,
                "season":player.season
-               } for player in TeamSquad.query.filter_by(team_id=team.id).all()]
+               } for player in TeamSquad.query.join(TeamSquad.player)
+                                              .options(contains_eager(TeamSquad.player))
+                                              .filter(TeamSquad.team_id == team.id).all()]
     
-    matches = {"home":team.home_matches, 
-               "away":team.away_matches,
-               "linesup":team.lineups,
-               "standings":team.standings
+    matches = {"home":[game.to_dict() for game in team.home_matches],
+               "away":[game.to_dict() for game in team.away_matches],
+               "linesup":[lineup.to_dict() for lineup in team.lineups],
+               "standings":[standing.to_dict() for standing in team.standings]
                }
 
     return json_ok({"players":squard, 
@@ -231,6 +276,9 @@ def create_match():
     if not admin:
         return json_err({"error": "Admin not found"}, 404)
 
+    if not Match.parse_kickoff(match_date, match_time):
+        return json_err({"error": "match_date must be YYYY-MM-DD and match_time HH:MM"})
+
     new_match = Match(
         competition_id=Competition_id,
         home_team_id=home_team_id,
@@ -245,34 +293,91 @@ def create_match():
 
 # GET MATCHES
 @teams_bp.route("/get_matches", methods=['GET'])
+@response_cache.cached("matches", "teams", "competitions")
 def get_matches():
-    matches = Match.query.all()
-    
+    relations = ("competition", "home_team", "away_team")
+    sort_keys = (Match.kickoff_at, Match.id)
+    try:
+        fields = parse_fields(Match, request.args.get("fields"), relations=relations)
+        cursor, limit = page_args(request.args)
+        kickoff_from = parse_kickoff_bound(request.args.get("from"))
+        kickoff_to = parse_kickoff_bound(request.args.get("to"), end=True)
+        if fields:
+            # only the requested columns and relations are selected/joined
+            query = Match.query.options(
+                load_only_fields(Match, fields, required=[key.key for key in sort_keys]),
+                *[joinedload(getattr(Match, name)) for name in relations if name in fields])
+        else:
+            query = Match.query_with_related()
+        if kickoff_from:
+            query = query.filter(Match.kickoff_at >= kickoff_from)
+        if kickoff_to:
+            query = query.filter(Match.kickoff_at < kickoff_to)
+        matches, next_cursor = keyset_page(query, sort_keys, cursor, limit)
+    except ValueError as e:
+        return json_err({"error": str(e)})
+
+    serialize = serializer_for(Match, only=fields)
     all_matches = []
     for game in matches:
-        team = Team.query.filter_by(id=game.home_team_id).first()
-        opponent = Team.query.filter_by(id=game.away_team_id).first()
-        match_info = game.to_dict()
-        match_info["competition"] = game.competition.to_dict() if game.competition else None
-        match_info["home_team"] = team.to_dict() if team else None
-        match_info["away_team"] = opponent.to_dict() if opponent else None
-        match_info['match_id'] = game.id
-        match_info['status'] = game.status
+        match_info = serialize(game)
+        for name in relations:
+            if fields is None or name in fields:
+                related = getattr(game, name)
+                match_info[name] = related.to_dict() if related else None
+        if fields is None:
+            match_info['match_id'] = game.id
+            match_info['status'] = game.status
         all_matches.append(match_info)
 
-    return json_ok({"matches": all_matches})
+    return json_ok({"matches": all_matches, "next_cursor": next_cursor})
 
 # GET COMPETITIONS
 @teams_bp.route("/get_competitions", methods=['GET'])
+@response_cache.cached("competitions", "matches")
 def get_competitions():
-    competitions = Competition.query.all()
-    competitions = [comp.to_dict() for comp in competitions]
-    com_matches = {}
-    for comp in competitions:
-        matches = Match.query.filter_by(competition_id=comp['id']).all()
-        com_matches[comp['id']] = [match.to_dict() for match in matches]
+    view = request.args.get("view", "all")
+    upcoming = request.args.get("upcoming", type=int)
+
+    if view not in ("all", "counts"):
+        return json_err({"error": "view must be 'all' or 'counts'"})
+
+    if upcoming is not None and upcoming < 1:
+        return json_err({"error": "upcoming must be a positive number"})
+
+    try:
+        fields = parse_fields(Competition, request.args.get("fields"))
+        match_fields = parse_fields(Match, request.args.get("match_fields"))
+        cursor, limit = page_args(request.args)
+        query = Competition.query
+        if fields:
+            query = query.options(load_only_fields(Competition, fields))
+        competitions, next_cursor = keyset_page(query, (Competition.id,), cursor, limit)
+    except (CursorError, FieldsError) as e:
+        return json_err({"error": str(e)})
 
-    return json_ok({"competitions": competitions, "com_matches": com_matches})
+    competition_ids = [comp.id for comp in competitions]
+    serialize = serializer_for(Competition, only=fields)
+    competitions = [serialize(comp) for comp in competitions]
+
+    if view == "counts":
+        com_match_counts = Match.count_by_competition(competition_ids)
+        return json_ok({"competitions": competitions,
+                        "com_match_counts": com_match_counts,
+                        "next_cursor": next_cursor})
+
+    options = ()
+    if match_fields:
+        options = (load_only_fields(Match, match_fields,
+                                    required=("competition_id", "kickoff_at")),)
+    grouped = Match.group_by_competition(competition_ids, upcoming=upcoming, options=options)
+    serialize_match = serializer_for(Match, only=match_fields)
+    com_matches = {comp_id: [serialize_match(match) for match in matches]
+                   for comp_id, matches in grouped.items()}
+
+    return json_ok({"competitions": competitions,
+                    "com_matches": com_matches,
+                    "next_cursor": next_cursor})
 
 # UPDATE MATCH SCORE
 @teams_bp.route("/update_match_score", methods=['POST'])
@@ -286,6 +391,8 @@ def update_match_score():
         match_status = request.json.get("match_status")
         extra_time = request.json.get("extra_time")
         added_time = request.json.get("added_time")
+        # shoot-out for a knockout tie level at full time
+        penalties = (request.json.get("home_penalties"), request.json.get("away_penalties"))
     except Exception as e:
         return json_err({"error": str(e)})
 
@@ -293,18 +400,34 @@ def update_match_score():
     if not admin:
         return json_err({"error": "Admin not found"}, 404)
 
-    match = Match.query.filter_by(id=match_id).first()
+    # FOR UPDATE serializes corrections where the database has row locks;
+    # SQLite drops it, so claim_result below is what stops two corrections
+    # from both applying a delta against the same "before" snapshot
+    match = Match.query.filter_by(id=match_id).with_for_update().first()
     if not match:
         print(f"Match {match_id} not found")
         return json_err({"error": "Match not found"}, 404)
 
+    before = standings.snapshot(match)
+
     match.home_score = home_score
     match.away_score = away_score
     match.added_time = int(added_time)
     match.extra_time = int(extra_time)
     match.status = match_status if match_status else match.status
-    match.save()
-    
+
+    try:
+        results.claim_result(match)
+    except results.ResultConflict as e:
+        db.session.rollback()
+        return json_err({"error": str(e)}, 409)
+
+    try:
+        results.save_result(match, before, penalties=None if penalties == (None, None) else penalties)
+    except brackets.BracketError as e:
+        db.session.rollback()
+        return json_err({"error": str(e)})
+
     return json_ok({"updated_match": match.to_dict()})
 
 
@@ -329,4 +452,42 @@ def create_county():
 
 
     
-    
\ No newline at end of file
+    
+# HEAD TO HEAD BETWEEN TWO TEAMS
+@teams_bp.route("/head_to_head", methods=['GET'])
+@response_cache.cached("matches", "teams", "competitions")
+def head_to_head():
+    team_id = request.args.get("team_id", type=int)
+    opponent_id = request.args.get("opponent_id", type=int)
+    recent = request.args.get("recent", 5, type=int)
+
+    if not team_id or not opponent_id or team_id == opponent_id:
+        return json_err({"error": "two different team ids are required"})
+
+    if not 0 <= recent <= 50:
+        return json_err({"error": "recent must be between 0 and 50"})
+
+    team = Team.get_team(team_id)
+    opponent = Team.get_team(opponent_id)
+    if not team or not opponent:
+        return json_err({"error": "Team Not Found"}, 404)
+
+    summary = Match.head_to_head(team.id, opponent.id)
+    # the same finished meetings the summary counts, newest first
+    meetings = Match.query_with_related().filter(
+        *Match.pair_filter(team.id, opponent.id),
+        func.lower(Match.status) == "ft",
+    ).order_by(Match.kickoff_at.desc()).limit(recent).all()
+
+    recent_meetings = []
+    for game in meetings:
+        match_info = game.to_dict()
+        match_info["competition"] = game.competition.to_dict() if game.competition else None
+        match_info["home_team"] = game.home_team.to_dict() if game.home_team else None
+        match_info["away_team"] = game.away_team.to_dict() if game.away_team else None
+        recent_meetings.append(match_info)
+
+    return json_ok({"team": team.to_dict(),
+                    "opponent": opponent.to_dict(),
+                    "summary": summary,
+                    "recent_meetings": recent_meetings})
@@ -0,0 +1,23 @@
+from flask import request, Blueprint, current_app
+from app_dir import json_err, json_ok, sync
+
+sync_bp = Blueprint("sync", __name__, url_prefix="/sync")
+
+# CHANGES SINCE A WATERMARK (delta sync for the apps)
+@sync_bp.route("/changes", methods=['GET'])
+def get_changes():
+    watermark = request.args.get("since")
+    limit = request.args.get("limit", sync.DEFAULT_LIMIT, type=int)
+
+    if not 1 <= limit <= sync.MAX_LIMIT:
+        return json_err({"error": f"limit must be between 1 and {sync.MAX_LIMIT}"})
+
+    try:
+        types = sync.parse_types(request.args.get("types"))
+        changes, new_watermark, has_more = sync.changes_since(
+            types, watermark, limit, current_app.config["SYNC_LAG_SECONDS"])
+    except sync.WatermarkError as e:
+        return json_err({"error": str(e)})
+
+    # has_more: call again with the new watermark straight away
+    return json_ok({"changes": changes, "watermark": new_watermark, "has_more": has_more})
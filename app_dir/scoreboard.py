@@ -0,0 +1,112 @@
+import threading
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+from app_dir import broker, db
+from app_dir.models import Match, Team
+
+
+class ScoreEntry:
+    # one live match; slotted so a matchday's worth stays a few KB
+    __slots__ = ("match_id", "competition_id", "home_team_id", "away_team_id", "home_team",
+                 "away_team", "home_score", "away_score", "status", "added_time",
+                 "extra_time", "kickoff_at")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    def update(self, data):
+        for name in self.__slots__:
+            if name in data:
+                setattr(self, name, data[name])
+        if isinstance(self.kickoff_at, str):
+            self.kickoff_at = datetime.fromisoformat(self.kickoff_at)
+
+    def to_dict(self, now):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        minute = None
+        if self.kickoff_at is not None:
+            # wall clock since kick-off; doesn't know about the half-time break
+            minute = max(int((now - self.kickoff_at).total_seconds() // 60) + 1, 1)
+            data["kickoff_at"] = self.kickoff_at.isoformat()
+        data["minute"] = minute
+        return data
+
+
+class Scoreboard:
+    # In-memory board of the matches currently live, kept current from
+    # broker "score" messages. It loads from the database on first use
+    # (and so after a restart), and again whenever a message names a live
+    # match it can't describe.
+
+    def __init__(self):
+        self._entries = None  # match_id -> ScoreEntry; None until loaded
+        self._replay = None   # messages that arrived during a load
+        self._lock = threading.Lock()
+        self._loading = threading.Lock()
+
+    def _load(self):
+        home, away = aliased(Team), aliased(Team)
+        rows = db.session.query(
+            Match.id.label("match_id"), Match.competition_id, Match.home_team_id, Match.away_team_id,
+            home.name.label("home_team"), away.name.label("away_team"),
+            Match.home_score, Match.away_score, Match.status, Match.added_time, Match.extra_time,
+            Match.kickoff_at,
+        ).outerjoin(home, home.id == Match.home_team_id) \
+         .outerjoin(away, away.id == Match.away_team_id) \
+         .filter(func.lower(Match.status) == "live")
+        return {row.match_id: ScoreEntry(**row._mapping) for row in rows}
+
+    def rebuild(self, only_if_unloaded=False):
+        with self._loading:
+            if only_if_unloaded and self._entries is not None:
+                return
+            with self._lock:
+                self._replay = []
+            entries = self._load()
+            with self._lock:
+                # scores are absolute values, so replaying messages the load
+                # already saw is harmless
+                replay, self._replay = self._replay, None
+                self._entries = entries
+                for message in replay:
+                    self._apply(message)
+
+    def apply(self, message):
+        if message.event != "score":
+            return
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append(message)
+            elif self._entries is not None:
+                self._apply(message)
+
+    def _apply(self, message):
+        data = message.data
+        entry = self._entries.get(data["match_id"])
+        status = data.get("status", entry.status if entry else None)
+        if (status or "").lower() != "live":
+            self._entries.pop(data["match_id"], None)
+        elif entry is not None:
+            entry.update(data)
+        elif "home_team" in data:
+            entry = self._entries[data["match_id"]] = ScoreEntry()
+            entry.update(data)
+        else:
+            # a live match this board never saw go live
+            self._entries = None
+
+    def matches(self, competition_id=None):
+        if self._entries is None:
+            self.rebuild(only_if_unloaded=True)
+        now = datetime.utcnow()
+        with self._lock:
+            entries = [entry for entry in (self._entries or {}).values()
+                       if competition_id is None or entry.competition_id == competition_id]
+            entries.sort(key=lambda entry: (entry.kickoff_at or datetime.min, entry.match_id))
+            return [entry.to_dict(now) for entry in entries]
+
+
+scoreboard = Scoreboard()
+broker.listen(scoreboard.apply)
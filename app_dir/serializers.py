@@ -0,0 +1,76 @@
+from operator import attrgetter, itemgetter
+from sqlalchemy import DateTime
+from sqlalchemy.orm import load_only
+
+# (model, exclude, only) -> serializer function, built once per combination
+_serializers = {}
+
+
+def serializer_for(model, exclude=None, only=None):
+    key = (
+        model,
+        frozenset(exclude or ()),
+        frozenset(only) if only is not None else None,
+    )
+    serializer = _serializers.get(key)
+    if serializer is None:
+        serializer = _serializers[key] = _build(model, key[1], key[2])
+    return serializer
+
+
+def _build(model, exclude, only):
+    columns = [
+        column for column in model.__table__.columns
+        if column.name not in exclude and (only is None or column.name in only)
+    ]
+    names = tuple(column.name for column in columns)
+    datetime_names = tuple(column.name for column in columns if isinstance(column.type, DateTime))
+
+    if len(names) > 1:
+        get_loaded, get_values = itemgetter(*names), attrgetter(*names)
+    elif names:
+        get_one_loaded, get_one = itemgetter(names[0]), attrgetter(names[0])
+        get_loaded = lambda state: (get_one_loaded(state),)
+        get_values = lambda obj: (get_one(obj),)
+    else:
+        get_loaded = get_values = lambda obj: ()
+
+    def serialize(obj):
+        # loaded column values sit in the instance __dict__; only expired or
+        # deferred ones need to go through the instrumented attributes
+        try:
+            values = get_loaded(obj.__dict__)
+        except KeyError:
+            values = get_values(obj)
+        data = dict(zip(names, values))
+        for name in datetime_names:
+            value = data[name]
+            if value is not None:
+                data[name] = value.isoformat()
+        return data
+
+    return serialize
+
+
+class FieldsError(ValueError):
+    pass
+
+
+def parse_fields(model, raw, relations=()):
+    # ?fields=id,name,logo -> frozenset of column (or relation) names,
+    # None when the client asked for everything
+    if not raw:
+        return None
+
+    requested = frozenset(name.strip() for name in raw.split(",") if name.strip())
+    unknown = requested - set(model.__table__.columns.keys()) - set(relations)
+    if unknown:
+        raise FieldsError(f"unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def load_only_fields(model, fields, required=()):
+    # columns outside the fieldset are never selected; `required` keeps the
+    # ones the route itself needs (sort keys, grouping keys) loaded
+    names = (set(fields) & set(model.__table__.columns.keys())) | set(required) | {"id"}
+    return load_only(*(getattr(model, name) for name in sorted(names)))
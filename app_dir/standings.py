@@ -0,0 +1,216 @@
+from array import array
+from sqlalchemy import and_, case, func, insert, or_, select, update
+from sqlalchemy.orm import aliased
+from app_dir import db, response_cache
+from app_dir.models import Competition, Match, Standing, Team
+
+POINTS_FOR_WIN = 3
+POINTS_FOR_DRAW = 1
+
+# order of the per-team delta lists below
+COUNTERS = ("played", "won", "drawn", "lost", "goals_for", "goals_against", "points")
+
+
+def snapshot(match):
+    # what the match contributed to the table before a write
+    return (match.is_finished, int(match.home_score or 0), int(match.away_score or 0))
+
+
+def apply_result_change(match, before):
+    # reverse the old FT result (if any) and apply the new one, in the
+    # caller's transaction; nothing is committed here
+    after = snapshot(match)
+    if after == before or match.competition_id is None or not (before[0] or after[0]):
+        return False
+
+    deltas = {match.home_team_id: [0] * len(COUNTERS), match.away_team_id: [0] * len(COUNTERS)}
+    for (finished, home_goals, away_goals), sign in ((before, -1), (after, 1)):
+        if finished:
+            add_result(deltas[match.home_team_id], home_goals, away_goals, sign)
+            add_result(deltas[match.away_team_id], away_goals, home_goals, sign)
+
+    for team_id, delta in deltas.items():
+        standing = Standing.get_or_create(match.competition_id, team_id)
+        for name, value in zip(COUNTERS, delta):
+            if value:
+                # column expression so concurrent writers don't overwrite each other
+                setattr(standing, name, getattr(Standing, name) + value)
+    bump_version(match.competition_id)
+    return True
+
+
+def bump_version(competition_id):
+    # cached tables are keyed on (competition, standings_version)
+    db.session.execute(
+        update(Competition)
+        .where(Competition.id == competition_id)
+        .values(standings_version=Competition.standings_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def table_version(competition):
+    # what a rendered table depends on: its results (standings_version)
+    # and the competition and team rows whose names and logos it embeds;
+    # renames move updated_at, so they move the version too
+    teams_updated = db.session.execute(
+        select(func.max(Team.updated_at))
+        .join(Standing, Standing.team_id == Team.id)
+        .where(Standing.competition_id == competition.id)
+        .execution_options(include_deleted=True)
+    ).scalar()
+    stamps = (competition.updated_at, teams_updated)
+    return "-".join([str(competition.standings_version),
+                     *(f"{stamp:%Y%m%d%H%M%S%f}" if stamp else "0" for stamp in stamps)])
+
+
+def add_result(delta, scored, conceded, sign=1):
+    delta[0] += sign
+    delta[4] += sign * scored
+    delta[5] += sign * conceded
+    if scored > conceded:
+        delta[1] += sign
+        delta[6] += sign * POINTS_FOR_WIN
+    elif scored == conceded:
+        delta[2] += sign
+        delta[6] += sign * POINTS_FOR_DRAW
+    else:
+        delta[3] += sign
+
+
+def rebuild(competition_id):
+    # full recompute from the finished matches: one streamed pass into
+    # per-counter arrays indexed by team slot, then one bulk UPDATE by
+    # primary key and one bulk INSERT for teams without a row yet
+    results = db.session.execute(
+        select(Match.home_team_id, Match.away_team_id, Match.home_score, Match.away_score)
+        .where(Match.competition_id == competition_id, func.lower(Match.status) == "ft")
+        .execution_options(yield_per=2000)
+    )
+
+    slots = {}
+    played, won, drawn, lost, goals_for, goals_against = (array("l") for _ in range(6))
+    counters = (played, won, drawn, lost, goals_for, goals_against)
+
+    for home_id, away_id, home_goals, away_goals in results:
+        home = slots.get(home_id)
+        if home is None:
+            home = slots[home_id] = len(slots)
+            for counter in counters:
+                counter.append(0)
+        away = slots.get(away_id)
+        if away is None:
+            away = slots[away_id] = len(slots)
+            for counter in counters:
+                counter.append(0)
+
+        home_goals = home_goals or 0
+        away_goals = away_goals or 0
+        played[home] += 1
+        played[away] += 1
+        goals_for[home] += home_goals
+        goals_against[home] += away_goals
+        goals_for[away] += away_goals
+        goals_against[away] += home_goals
+        if home_goals > away_goals:
+            won[home] += 1
+            lost[away] += 1
+        elif home_goals == away_goals:
+            drawn[home] += 1
+            drawn[away] += 1
+        else:
+            won[away] += 1
+            lost[home] += 1
+
+    existing = dict(db.session.execute(
+        select(Standing.team_id, Standing.id)
+        .where(Standing.competition_id == competition_id)
+        .execution_options(include_deleted=True)
+    ).all())
+
+    updates, inserts = [], []
+    for team_id in existing.keys() | slots.keys():
+        slot = slots.get(team_id)
+        row = {"played": 0, "won": 0, "drawn": 0, "lost": 0,
+               "goals_for": 0, "goals_against": 0, "points": 0,
+               "is_deleted": False, "is_active": True}
+        if slot is not None:
+            row.update(
+                played=played[slot], won=won[slot], drawn=drawn[slot], lost=lost[slot],
+                goals_for=goals_for[slot], goals_against=goals_against[slot],
+                points=won[slot] * POINTS_FOR_WIN + drawn[slot] * POINTS_FOR_DRAW,
+            )
+        if team_id in existing:
+            row["id"] = existing[team_id]
+            updates.append(row)
+        else:
+            row.update(competition_id=competition_id, team_id=team_id)
+            inserts.append(row)
+
+    if updates:
+        db.session.execute(update(Standing), updates)
+    if inserts:
+        db.session.execute(insert(Standing), inserts)
+    bump_version(competition_id)
+    db.session.commit()
+    response_cache.invalidate("standings", "competitions")
+    return len(updates) + len(inserts)
+
+
+def table(competition_id):
+    # ordered league table in one query: the head-to-head column is the
+    # points a team took off the teams level with it on points, and the
+    # position comes from a window over points, GD, goals scored and H2H
+    rival = aliased(Standing)
+    is_home = Match.home_team_id == Standing.team_id
+    won = or_(
+        and_(is_home, Match.home_score > Match.away_score),
+        and_(~is_home, Match.away_score > Match.home_score),
+    )
+    head_to_head = (
+        select(func.coalesce(func.sum(case(
+            (won, POINTS_FOR_WIN),
+            (Match.home_score == Match.away_score, POINTS_FOR_DRAW),
+            else_=0,
+        )), 0))
+        .select_from(Match)
+        .join(rival, and_(
+            rival.competition_id == Standing.competition_id,
+            rival.points == Standing.points,
+            rival.team_id != Standing.team_id,
+            or_(rival.team_id == Match.home_team_id, rival.team_id == Match.away_team_id),
+        ))
+        .where(
+            Match.competition_id == Standing.competition_id,
+            func.lower(Match.status) == "ft",
+            or_(is_home, Match.away_team_id == Standing.team_id),
+        )
+        .correlate(Standing)
+        .scalar_subquery()
+    )
+
+    rows = (
+        select(
+            Standing.team_id,
+            Team.name.label("team_name"),
+            Team.logo.label("team_logo"),
+            Standing.played, Standing.won, Standing.drawn, Standing.lost,
+            Standing.goals_for, Standing.goals_against,
+            (Standing.goals_for - Standing.goals_against).label("goal_difference"),
+            head_to_head.label("head_to_head"),
+            Standing.points,
+        )
+        .join(Team, Team.id == Standing.team_id)
+        .where(Standing.competition_id == competition_id)
+        .subquery()
+    )
+    position = func.row_number().over(order_by=(
+        rows.c.points.desc(),
+        rows.c.goal_difference.desc(),
+        rows.c.goals_for.desc(),
+        rows.c.head_to_head.desc(),
+        rows.c.team_name,
+    )).label("position")
+
+    query = select(rows, position).order_by(position)
+    return [dict(row._mapping) for row in db.session.execute(query)]
@@ -0,0 +1,81 @@
+import base64, binascii, json
+from datetime import datetime, timedelta
+from app_dir.models import Competition, County, Match, Player, Standing, Team
+from app_dir.pagination import CursorError, encode_cursor, keyset_page
+from app_dir.serializers import serializer_for
+
+# what a client can ask to sync, by response key
+SYNC_TYPES = {
+    "competitions": Competition,
+    "counties": County,
+    "teams": Team,
+    "players": Player,
+    "matches": Match,
+    "standings": Standing,
+}
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 1000
+
+
+class WatermarkError(ValueError):
+    pass
+
+
+def encode_watermark(marks):
+    raw = json.dumps(marks, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_watermark(watermark):
+    # {type: keyset cursor over (updated_at, id)}; {} for a first sync
+    if not watermark:
+        return {}
+    try:
+        marks = json.loads(base64.urlsafe_b64decode(watermark + "=" * (-len(watermark) % 4)))
+        if not isinstance(marks, dict) or not all(isinstance(mark, str) for mark in marks.values()):
+            raise ValueError
+        return marks
+    except (binascii.Error, TypeError, ValueError):
+        raise WatermarkError("invalid watermark")
+
+
+def parse_types(raw):
+    if not raw:
+        return list(SYNC_TYPES)
+    types = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = sorted(set(types) - set(SYNC_TYPES))
+    if unknown:
+        raise WatermarkError(f"unknown types: {', '.join(unknown)}")
+    return list(dict.fromkeys(types))
+
+
+def changes_since(types, watermark, limit=DEFAULT_LIMIT, lag_seconds=2):
+    # rows of each type created, updated or soft-deleted after the
+    # watermark, read as (updated_at, id) range scans. Rows newer than
+    # `lag_seconds` wait for the next sync so a transaction that commits
+    # after a later one can't slip behind the watermark.
+    marks = decode_watermark(watermark)
+    horizon = datetime.utcnow() - timedelta(seconds=lag_seconds)
+
+    changes, has_more = {}, False
+    for name in types:
+        model = SYNC_TYPES[name]
+        columns = (model.updated_at, model.id)
+        mark = marks.get(name)
+        # a first sync only needs live rows; later ones must see deletions
+        query = model.with_deleted() if mark else model.query
+        try:
+            rows, next_cursor = keyset_page(query.filter(model.updated_at < horizon), columns, mark, limit)
+        except CursorError:
+            raise WatermarkError(f"invalid watermark for {name}")
+
+        serialize = serializer_for(model)
+        changes[name] = [serialize(row) for row in rows]
+        if next_cursor:
+            marks[name] = next_cursor
+            has_more = True
+        else:
+            # everything before the horizon has been sent
+            marks[name] = encode_cursor([horizon, 0])
+
+    return changes, encode_watermark(marks), has_more
@@ -0,0 +1,83 @@
+"""match kickoff timestamp
+
+Revision ID: a8ceb6ddf628
+Revises: 69c7949b19bf
+Create Date: 2026-10-17 22:19:05.656986
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8ceb6ddf628'
+down_revision = '69c7949b19bf'
+branch_labels = None
+depends_on = None
+
+
+KICKOFF_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y')
+KICKOFF_TIME_FORMATS = ('%H:%M', '%H:%M:%S')
+
+
+def parse_kickoff(match_date, match_time):
+    # frozen copy of Match.parse_kickoff at the time of this revision
+    if not match_date or not match_time:
+        return None
+    for date_format in KICKOFF_DATE_FORMATS:
+        for time_format in KICKOFF_TIME_FORMATS:
+            try:
+                return datetime.strptime(f'{match_date.strip()} {match_time.strip()}',
+                                         f'{date_format} {time_format}')
+            except ValueError:
+                continue
+    return None
+
+
+def upgrade():
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('kickoff_at', sa.DateTime(), nullable=True))
+
+    # backfill from the string columns; rows that don't parse fall back to
+    # their creation time so the column can be made NOT NULL
+    connection = op.get_bind()
+    matches = sa.table(
+        'matches',
+        sa.column('id', sa.Integer),
+        sa.column('match_date', sa.String),
+        sa.column('match_time', sa.String),
+        sa.column('created_at', sa.DateTime),
+        sa.column('kickoff_at', sa.DateTime),
+    )
+    rows = connection.execute(
+        sa.select(matches.c.id, matches.c.match_date, matches.c.match_time, matches.c.created_at)
+    ).all()
+    for match_id, match_date, match_time, created_at in rows:
+        kickoff_at = parse_kickoff(match_date, match_time) or created_at
+        connection.execute(
+            matches.update().where(matches.c.id == match_id).values(kickoff_at=kickoff_at)
+        )
+
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.alter_column('kickoff_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.drop_index(batch_op.f('ix_matches_competition_schedule'))
+        batch_op.drop_index(batch_op.f('ix_matches_live_schedule'), sqlite_where=sa.text('is_deleted = 0'))
+        batch_op.drop_index(batch_op.f('ix_matches_team_pair'))
+        batch_op.create_index('ix_matches_team_pair', ['pair_low_id', 'pair_high_id', 'kickoff_at'], unique=False)
+        batch_op.create_index('ix_matches_competition_kickoff', ['competition_id', 'kickoff_at'], unique=False)
+        batch_op.create_index('ix_matches_live_kickoff', ['kickoff_at', 'id'], unique=False, sqlite_where=sa.text('is_deleted = 0'), postgresql_where=sa.text('is_deleted = false'))
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('matches', schema=None) as batch_op:
+        batch_op.drop_index('ix_matches_live_kickoff', sqlite_where=sa.text('is_deleted = 0'), postgresql_where=sa.text('is_deleted = false'))
+        batch_op.drop_index('ix_matches_competition_kickoff')
+        batch_op.drop_index('ix_matches_team_pair')
+        batch_op.create_index(batch_op.f('ix_matches_team_pair'), ['pair_low_id', 'pair_high_id', 'match_date', 'match_time'], unique=False)
+        batch_op.create_index(batch_op.f('ix_matches_live_schedule'), ['match_date', 'match_time', 'id'], unique=False, sqlite_where=sa.text('is_deleted = 0'), postgresql_where=sa.text('is_deleted = false'))
+        batch_op.create_index(batch_op.f('ix_matches_competition_schedule'), ['competition_id', 'match_date', 'match_time'], unique=False)
+        batch_op.drop_column('kickoff_at')
+
+    # ### end Alembic commands ###